@@ -1,8 +1,12 @@
 from fastapi import APIRouter
 
-from app.api.routes import auth, menu, reservations
+from app.api.routes import auth, locations, menu, orders, reports, reservations, system
 
 api_router = APIRouter()
 api_router.include_router(auth.router)
+api_router.include_router(locations.router)
 api_router.include_router(menu.router)
+api_router.include_router(orders.router)
 api_router.include_router(reservations.router)
+api_router.include_router(reports.router)
+api_router.include_router(system.router)
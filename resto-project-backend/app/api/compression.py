@@ -0,0 +1,65 @@
+import anyio
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import GZipMiddleware, GZipResponder, IdentityResponder
+from starlette.types import Receive, Scope, Send
+
+from app.core.static import accepted_encodings
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+class BrotliResponder(IdentityResponder):
+    content_encoding = "br"
+
+    def __init__(self, app, minimum_size: int, quality: int = 4, thread_minimum_size: int = 128 * 1024, **kwargs):
+        super().__init__(app, minimum_size, **kwargs)
+        self.quality = quality
+        self.thread_minimum_size = thread_minimum_size
+        self._compressor = None
+
+    async def apply_compression(self, body: bytes, *, more_body: bool) -> bytes:
+        if len(body) >= self.thread_minimum_size:
+            return await anyio.to_thread.run_sync(self._compress_body, body, more_body)
+        return self._compress_body(body, more_body)
+
+    def _compress_body(self, body: bytes, more_body: bool) -> bytes:
+        if self._compressor is None:
+            self._compressor = brotli.Compressor(quality=self.quality)
+        chunk = self._compressor.process(body)
+        return chunk + (self._compressor.flush() if more_body else self._compressor.finish())
+
+
+class CompressionMiddleware(GZipMiddleware):
+    def __init__(self, app, minimum_size: int = 1024, compresslevel: int = 6, brotli_quality: int = 4, **kwargs):
+        super().__init__(app, minimum_size=minimum_size, compresslevel=compresslevel, **kwargs)
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        accepted = accepted_encodings(Headers(scope=scope).get("accept-encoding", ""))
+        options = {"exclude_content_types": self.exclude_content_types}
+        if brotli is not None and "br" in accepted:
+            responder = BrotliResponder(
+                self.app,
+                self.minimum_size,
+                self.brotli_quality,
+                thread_minimum_size=self.thread_minimum_size,
+                **options,
+            )
+        elif "gzip" in accepted:
+            responder = GZipResponder(
+                self.app,
+                self.minimum_size,
+                compresslevel=self.compresslevel,
+                thread_minimum_size=self.thread_minimum_size,
+                **options,
+            )
+        else:
+            responder = IdentityResponder(self.app, self.minimum_size, **options)
+        await responder(scope, receive, send)
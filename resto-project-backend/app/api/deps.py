@@ -1,14 +1,17 @@
-from typing import Generator, Optional, Set
+from typing import AsyncGenerator, Generator, Optional, Set
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Query, status
 from fastapi.security import OAuth2PasswordBearer
-from jose import JWTError, jwt
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
-from app.db.session import SessionLocal
-from app.crud.user import get_user
-from app.schemas.token import TokenData
+from app.core.security import decode_access_token
+from app.db.replicas import is_recent_writer, mark_recent_writer, open_async_read_session, open_read_session
+from app.db.session import AsyncSessionLocal, DbSession, SessionLocal, read_replicas, run_db
+from app.crud.location import location_exists
+from app.crud.user import get_user, get_user_state
+from app.schemas.token import Principal, TokenData
 
 
 oauth2_scheme = OAuth2PasswordBearer(
@@ -16,55 +19,141 @@ oauth2_scheme = OAuth2PasswordBearer(
 )
 
 
-def get_db() -> Generator[Session, None, None]:
+def _token_subject(token: Optional[str]) -> Optional[int]:
+    if not token:
+        return None
+    payload = decode_access_token(token)
+    try:
+        return int(payload["sub"])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def _after_request(db: DbSession, token: Optional[str]) -> None:
+    if read_replicas is not None and db.info.get("wrote"):
+        user_id = _token_subject(token)
+        if user_id is not None:
+            mark_recent_writer(user_id)
+
+
+def _prefers_primary(token: Optional[str]) -> bool:
+    user_id = _token_subject(token)
+    return user_id is not None and is_recent_writer(user_id)
+
+
+def get_sync_db(token: Optional[str] = Depends(oauth2_scheme)) -> Generator[Session, None, None]:
     db = SessionLocal()
+    try:
+        yield db
+        _after_request(db, token)
+    finally:
+        db.close()
+
+
+async def get_async_db(token: Optional[str] = Depends(oauth2_scheme)) -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncSessionLocal() as db:
+        yield db
+        _after_request(db, token)
+
+
+def get_sync_read_db(token: Optional[str] = Depends(oauth2_scheme)) -> Generator[Session, None, None]:
+    if read_replicas is None or _prefers_primary(token):
+        db = SessionLocal()
+    else:
+        db = open_read_session(read_replicas, SessionLocal)
     try:
         yield db
     finally:
         db.close()
 
 
+async def get_async_read_db(token: Optional[str] = Depends(oauth2_scheme)) -> AsyncGenerator[AsyncSession, None]:
+    if read_replicas is None or _prefers_primary(token):
+        db = AsyncSessionLocal()
+    else:
+        db = await open_async_read_session(read_replicas, AsyncSessionLocal)
+    async with db:
+        yield db
+
+
+get_db = get_async_db if settings.DATABASE_ASYNC else get_sync_db
+get_read_db = get_async_read_db if settings.DATABASE_ASYNC else get_sync_read_db
+
+
 def _decode_token(token: str) -> TokenData:
+    payload = decode_access_token(token)
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        user_id = payload.get("sub")
-        role = payload.get("role")
-        return TokenData(user_id=int(user_id), role=role)
-    except (JWTError, TypeError, ValueError):
+        return TokenData(
+            user_id=int(payload["sub"]),
+            role=payload.get("role"),
+            version=payload.get("ver", 0),
+            location_id=payload.get("loc"),
+        )
+    except (KeyError, TypeError, ValueError):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
 
 
-def get_current_user_optional(
-    db: Session = Depends(get_db), token: Optional[str] = Depends(oauth2_scheme)
-):
-    if not token:
-        return None
+def _resolve_user(db: Session, token: str):
     token_data = _decode_token(token)
+    if settings.AUTH_STATELESS:
+        state = get_user_state(db, token_data.user_id)
+        if state is None:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+        is_active, token_version, location_id = state
+        if (
+            not is_active
+            or token_version != token_data.version
+            or location_id != token_data.location_id
+            or not token_data.role
+        ):
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token revoked")
+        return Principal(id=token_data.user_id, role=token_data.role, location_id=token_data.location_id)
+
     user = get_user(db, token_data.user_id)
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+    if not user.is_active or user.token_version != token_data.version or user.location_id != token_data.location_id:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token revoked")
     return user
 
 
-def get_current_user(
-    db: Session = Depends(get_db), token: Optional[str] = Depends(oauth2_scheme)
+async def get_current_user_optional(
+    db: DbSession = Depends(get_db), token: Optional[str] = Depends(oauth2_scheme)
+):
+    if not token:
+        return None
+    return await run_db(db, _resolve_user, token)
+
+
+async def get_current_user(
+    db: DbSession = Depends(get_db), token: Optional[str] = Depends(oauth2_scheme)
 ):
     if not token:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
-    token_data = _decode_token(token)
-    user = get_user(db, token_data.user_id)
-    if not user:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
-    return user
+    return await run_db(db, _resolve_user, token)
+
+
+async def get_location_id(
+    location_id: int = Query(settings.DEFAULT_LOCATION_ID, ge=1), db: DbSession = Depends(get_db)
+) -> int:
+    if not await run_db(db, location_exists, location_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Location not found")
+    return location_id
 
 
 def require_role(allowed_roles: Set[str]):
-    def checker(current_user=Depends(get_current_user)):
+    async def checker(current_user=Depends(get_current_user), location_id: int = Depends(get_location_id)):
         if current_user.role not in allowed_roles:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Not enough permissions",
             )
+        # Customers book across the chain; staff accounts pinned to a site only act there.
+        if current_user.role != "customer" and current_user.location_id not in (None, location_id):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Not allowed at this location",
+            )
         return current_user
 
     return checker
@@ -0,0 +1,54 @@
+import hashlib
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Dict
+
+from fastapi import Request, Response, status
+
+from app.core.cache import version_timestamp
+
+
+def validator_headers(version: str, *scope: str, private: bool = False) -> Dict[str, str]:
+    digest = hashlib.blake2b("|".join((version, *scope)).encode(), digest_size=12).hexdigest()
+    return {
+        "ETag": f'W/"{digest}"',
+        "Last-Modified": format_datetime(version_timestamp(version), usegmt=True),
+        "Cache-Control": "private, no-cache" if private else "no-cache",
+    }
+
+
+def read_validator_headers(db: Any, version: str, *scope: str, private: bool = False) -> Dict[str, str]:
+    # A replica can lag the primary's version counter, so its bodies must not carry its validators.
+    if db.info.get("replica"):
+        return {"Cache-Control": "private, no-cache" if private else "no-cache"}
+    return validator_headers(version, *scope, private=private)
+
+
+def is_not_modified(request: Request, headers: Dict[str, str]) -> bool:
+    if "ETag" not in headers:
+        return False
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        etag = _opaque_tag(headers["ETag"])
+        return any(_opaque_tag(tag) == etag for tag in if_none_match.split(","))
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            return False
+        return parsedate_to_datetime(headers["Last-Modified"]) <= since
+    return False
+
+
+def not_modified_response(headers: Dict[str, str]) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+
+def _opaque_tag(tag: str) -> str:
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
@@ -0,0 +1,107 @@
+import hashlib
+import time
+from typing import Any, AsyncIterator, Callable, Optional
+from urllib.parse import urlencode
+
+from fastapi import Depends, Header, HTTPException, Request, Response, status
+from sqlalchemy.orm import Session
+
+from app.api.deps import get_current_user_optional, get_db
+from app.core.config import settings
+from app.core.locks import KeyedLocks
+from app.crud.idempotency import (
+    claim_idempotency_key,
+    complete_idempotency_key,
+    purge_expired_idempotency_keys,
+    release_idempotency_key,
+)
+from app.db.session import DbSession, run_db
+
+
+class IdempotentReplay(Exception):
+    def __init__(self, response: Response):
+        self.response = response
+
+
+async def idempotent_replay_handler(request: Request, exc: IdempotentReplay) -> Response:
+    return exc.response
+
+
+class IdempotencyContext:
+    def __init__(self, db: DbSession, owner: str, key: str):
+        self.db = db
+        self.owner = owner
+        self.key = key
+        self.completed = False
+        self.body = b""
+
+    def before_commit(self, render: Callable[[Any], bytes]) -> Callable[[Session, Any], None]:
+        # The response is stored in the same transaction as the write, so a crash cannot leave one without the other.
+        def store(db: Session, result: Any) -> None:
+            self.body = render(result)
+            complete_idempotency_key(db, self.owner, self.key, status.HTTP_200_OK, self.body)
+
+        return store
+
+    def committed_response(self) -> Response:
+        self.completed = True
+        return Response(content=self.body, media_type="application/json")
+
+
+_key_locks = KeyedLocks()
+_last_purge = 0.0
+
+
+async def _purge_expired(db: DbSession) -> None:
+    global _last_purge
+    now = time.monotonic()
+    if now - _last_purge >= settings.IDEMPOTENCY_PURGE_INTERVAL_SECONDS:
+        _last_purge = now
+        await run_db(db, purge_expired_idempotency_keys)
+
+
+async def idempotency_key(
+    request: Request,
+    key: Optional[str] = Header(None, alias="Idempotency-Key", max_length=255),
+    db: DbSession = Depends(get_db),
+    current_user=Depends(get_current_user_optional),
+) -> AsyncIterator[Optional[IdempotencyContext]]:
+    if not key:
+        yield None
+        return
+    owner = f"user:{current_user.id}" if current_user is not None else "guest"
+    # The location and other inputs travel in the query string, so they are part of the fingerprint.
+    query = urlencode(sorted(request.query_params.multi_items()))
+    fingerprint = hashlib.sha256(f"{request.method} {request.url.path}?{query}\n".encode())
+    fingerprint.update(await request.body())
+    request_hash = fingerprint.hexdigest()
+    async with _key_locks.hold((owner, key)):
+        await _purge_expired(db)
+        record = await run_db(db, claim_idempotency_key, owner, key, request_hash)
+        if record is not None:
+            if record.request_hash != request_hash:
+                raise HTTPException(
+                    status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                    detail="Idempotency-Key was already used for a different request",
+                )
+            if record.status_code is None:
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail="A request with this Idempotency-Key is still in progress",
+                    headers={"Retry-After": "1"},
+                )
+            raise IdempotentReplay(
+                Response(
+                    content=record.response_body,
+                    status_code=record.status_code,
+                    media_type="application/json",
+                    headers={"Idempotent-Replayed": "true"},
+                )
+            )
+
+        context = IdempotencyContext(db, owner, key)
+        try:
+            yield context
+        finally:
+            if not context.completed:
+                await run_db(db, release_idempotency_key, owner, key)
@@ -0,0 +1,74 @@
+import time
+from typing import Dict, List, Optional, Tuple
+
+from fastapi.routing import iter_route_contexts
+from starlette.datastructures import MutableHeaders
+from starlette.routing import Mount
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.metrics import metrics, start_request
+
+
+class RouteLabels:
+    # Included routers keep router-relative paths and mounts never set scope["route"], so both
+    # are resolved to their full templates through the app's route contexts.
+    def __init__(self, routes):
+        self.templates: Dict[int, str] = {}
+        self.mounts: List[Tuple[str, str]] = []
+        for context in iter_route_contexts(routes):
+            if context.path_format is None:
+                continue
+            if isinstance(context.original_route, Mount):
+                self.mounts.append((context.path_format.removesuffix("{path}"), context.path_format))
+            else:
+                self.templates.setdefault(id(context.original_route), context.path_format)
+
+    def __call__(self, scope: Scope) -> str:
+        route = scope.get("route")
+        if route is not None:
+            return self.templates.get(id(route), route.path)
+        for prefix, template in self.mounts:
+            if scope["path"].startswith(prefix):
+                return template
+        return "unmatched"
+
+
+class TimingMiddleware:
+    def __init__(self, app: ASGIApp, server_timing: bool = True):
+        self.app = app
+        self.server_timing = server_timing
+        self._labels: Optional[RouteLabels] = None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = start_request()
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if self.server_timing:
+                    headers = MutableHeaders(scope=message)
+                    headers.append(
+                        "Server-Timing",
+                        f"app;dur={(time.perf_counter() - started) * 1000:.1f}, "
+                        f'db;dur={stats.db_seconds * 1000:.1f};desc="{stats.queries} queries, {stats.rows} rows"',
+                    )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            metrics.record_request(
+                scope["method"], self._route_label(scope), status_code, time.perf_counter() - started, stats
+            )
+
+    def _route_label(self, scope: Scope) -> str:
+        if self._labels is None:
+            self._labels = RouteLabels(scope["app"].routes)
+        return self._labels(scope)
@@ -0,0 +1,69 @@
+from functools import lru_cache
+from typing import Optional
+
+from fastapi import HTTPException, Request, Response, status
+
+from app.core.config import settings
+from app.core.rate_limit import Rule, parse_rule, rate_limit_store
+
+
+@lru_cache(maxsize=None)
+def _rule(value: str) -> Optional[Rule]:
+    return parse_rule(value) if value else None
+
+
+def client_ip(request: Request) -> str:
+    if settings.RATE_LIMIT_TRUST_FORWARDED:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return request.client.host if request.client else "unknown"
+
+
+async def _body_email(request: Request) -> Optional[str]:
+    try:
+        body = await request.json()
+    except ValueError:
+        return None
+    email = body.get("email") if isinstance(body, dict) else None
+    return email.strip().lower() if isinstance(email, str) and email.strip() else None
+
+
+def rate_limit(scope: str, ip_setting: str, email_setting: Optional[str] = None):
+    async def limiter(request: Request, response: Response) -> None:
+        if not settings.RATE_LIMIT_ENABLED:
+            return
+        checks = []
+        ip_rule = _rule(getattr(settings, ip_setting))
+        if ip_rule:
+            checks.append((f"{scope}:ip:{client_ip(request)}", ip_rule))
+        email_rule = _rule(getattr(settings, email_setting)) if email_setting else None
+        if email_rule:
+            email = await _body_email(request)
+            if email:
+                checks.append((f"{scope}:email:{email}", email_rule))
+
+        decisions = []
+        for key, rule in checks:
+            decision = rate_limit_store.hit(key, rule)
+            decisions.append(decision)
+            if not decision.allowed:
+                break
+        if not decisions:
+            return
+
+        tightest = min(decisions, key=lambda decision: (decision.allowed, decision.remaining))
+        headers = {
+            "RateLimit-Limit": str(tightest.limit),
+            "RateLimit-Remaining": str(tightest.remaining),
+            "RateLimit-Reset": str(tightest.reset),
+        }
+        if not tightest.allowed:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many requests",
+                headers={**headers, "Retry-After": str(tightest.reset)},
+            )
+        response.headers.update(headers)
+
+    return limiter
@@ -0,0 +1,30 @@
+from typing import Any
+
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from pydantic_core import to_json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _orjson_default(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    raise TypeError
+
+
+def dumps(content: Any) -> bytes:
+    if orjson is not None:
+        try:
+            return orjson.dumps(content, default=_orjson_default, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            pass
+    return to_json(content)
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
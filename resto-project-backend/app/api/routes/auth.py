@@ -1,33 +1,53 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
 
-from app.api.deps import get_current_user, get_db
-from app.core.security import create_access_token
-from app.crud.user import authenticate_user, create_user, get_user_by_email
+from app.api.deps import get_current_user, get_db, get_read_db
+from app.api.rate_limit import rate_limit
+from app.core.security import create_access_token, get_password_hash_async, verify_and_update_password
+from app.crud.user import create_user, get_user, get_user_by_email, update_password_hash
+from app.db.session import DbSession, run_db
 from app.schemas.token import Token
 from app.schemas.user import UserCreate, UserLogin, UserRead
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
 
-@router.post("/signup", response_model=UserRead)
-def signup(user_in: UserCreate, db: Session = Depends(get_db)):
-    existing = get_user_by_email(db, user_in.email)
+@router.post(
+    "/signup",
+    response_model=UserRead,
+    dependencies=[Depends(rate_limit("signup", "SIGNUP_RATE_LIMIT_IP"))],
+)
+async def signup(user_in: UserCreate, db: DbSession = Depends(get_db)):
+    existing = await run_db(db, get_user_by_email, user_in.email)
     if existing:
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Email already registered")
-    user = create_user(db, user_in, role="customer")
+    hashed_password = await get_password_hash_async(user_in.password)
+    user = await run_db(db, create_user, user_in, "customer", hashed_password)
     return user
 
 
-@router.post("/login", response_model=Token)
-def login(payload: UserLogin, db: Session = Depends(get_db)):
-    user = authenticate_user(db, payload.email, payload.password)
+@router.post(
+    "/login",
+    response_model=Token,
+    dependencies=[Depends(rate_limit("login", "LOGIN_RATE_LIMIT_IP", "LOGIN_RATE_LIMIT_EMAIL"))],
+)
+async def login(payload: UserLogin, db: DbSession = Depends(get_db)):
+    user = await run_db(db, get_user_by_email, payload.email)
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
-    access_token = create_access_token(subject=str(user.id), role=user.role)
+    verified, new_hash = await verify_and_update_password(payload.password, user.hashed_password)
+    if not verified:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
+    access_token = create_access_token(
+        subject=str(user.id), role=user.role, version=user.token_version, location_id=user.location_id
+    )
+    if new_hash:
+        await run_db(db, update_password_hash, user, new_hash)
     return Token(access_token=access_token, token_type="bearer")
 
 
 @router.get("/me", response_model=UserRead)
-def read_me(current_user=Depends(get_current_user)):
-    return current_user
+async def read_me(db: DbSession = Depends(get_read_db), current_user=Depends(get_current_user)):
+    user = await run_db(db, get_user, current_user.id)
+    if not user:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    return user
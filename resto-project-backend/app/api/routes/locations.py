@@ -0,0 +1,28 @@
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException, status
+
+from app.api.deps import get_db, get_read_db, require_role
+from app.crud.location import create_location, get_location_by_slug, list_locations
+from app.db.session import DbSession, run_db
+from app.schemas.location import LocationCreate, LocationRead
+
+router = APIRouter(prefix="/locations", tags=["locations"])
+
+
+@router.get("/", response_model=List[LocationRead])
+async def get_locations(db: DbSession = Depends(get_read_db)):
+    return await run_db(db, list_locations)
+
+
+@router.post("/", response_model=LocationRead)
+async def add_location(
+    location_in: LocationCreate,
+    db: DbSession = Depends(get_db),
+    current_user=Depends(require_role({"admin"})),
+):
+    if current_user.location_id is not None:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Chain-wide admin required")
+    if await run_db(db, get_location_by_slug, location_in.slug):
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Location slug already exists")
+    return await run_db(db, create_location, location_in)
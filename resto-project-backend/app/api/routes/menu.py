@@ -1,55 +1,166 @@
+import csv
+import io
 from pathlib import Path
-from typing import List
-from uuid import uuid4
-
-from fastapi import APIRouter, Depends, File, HTTPException, UploadFile, status
-from sqlalchemy.orm import Session
-
-from app.api.deps import get_db, require_role
-from app.crud.menu_item import create_menu_item, delete_menu_item, get_menu_item, list_menu_items, update_menu_item
-from app.schemas.menu_item import MenuItemCreate, MenuItemRead, MenuItemUpdate
+from typing import List, Literal, Optional
+
+from fastapi import APIRouter, Body, Depends, File, HTTPException, Query, Request, Response, UploadFile, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+
+from app.api.deps import get_db, get_location_id, get_read_db, require_role
+from app.api.http_cache import is_not_modified, not_modified_response, read_validator_headers, validator_headers
+from app.api.responses import dumps
+from app.core.cache import get_version
+from app.core.config import settings
+from app.core.images import image_pipeline
+from app.core.storage import store_image
+from app.db.replicas import open_async_read_session, open_read_session
+from app.db.session import AsyncSessionLocal, DbSession, SessionLocal, read_replicas, run_db
+from app.crud.menu_item import (
+    MENU_EXPORT_FIELDS,
+    bulk_upsert_menu_items,
+    create_menu_item,
+    delete_menu_item,
+    export_row,
+    iter_menu_items,
+    list_menu_items_json,
+    menu_export_query,
+    menu_namespace,
+    search_menu_items_json,
+    update_menu_item,
+)
+from app.models.menu_item import MenuItem
+from app.schemas.menu_item import MenuImportResult, MenuItemCreate, MenuItemRead, MenuItemUpdate
 
 router = APIRouter(prefix="/menu", tags=["menu"])
 
 UPLOAD_DIR = Path("uploads/menu")
-UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+EXPORT_BATCH_SIZE = 500
+EXPORT_MEDIA_TYPES = {"jsonl": "application/x-ndjson", "csv": "text/csv"}
+DEFAULT_SEARCH_LIMIT = 20
+MAX_SEARCH_LIMIT = 100
+
+
+def _encode_batch(items: List[MenuItem], fmt: str) -> bytes:
+    rows = [export_row(item) for item in items]
+    if fmt == "jsonl":
+        return b"".join(dumps(row) + b"\n" for row in rows)
+    buffer = io.StringIO()
+    csv.DictWriter(buffer, fieldnames=MENU_EXPORT_FIELDS).writerows({**row, "tags": ",".join(row["tags"])} for row in rows)
+    return buffer.getvalue().encode()
+
+
+def _csv_header() -> bytes:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(MENU_EXPORT_FIELDS)
+    return buffer.getvalue().encode()
+
+
+def _export_sync(fmt: str, location_id: int):
+    db = open_read_session(read_replicas, SessionLocal)
+    try:
+        if fmt == "csv":
+            yield _csv_header()
+        for items in iter_menu_items(db, location_id, EXPORT_BATCH_SIZE):
+            yield _encode_batch(items, fmt)
+    finally:
+        db.close()
+
+
+async def _export_async(fmt: str, location_id: int):
+    db = await open_async_read_session(read_replicas, AsyncSessionLocal)
+    async with db:
+        if fmt == "csv":
+            yield _csv_header()
+        stream = await db.stream_scalars(
+            menu_export_query(location_id).execution_options(yield_per=EXPORT_BATCH_SIZE)
+        )
+        async for items in stream.partitions():
+            yield _encode_batch(items, fmt)
 
 
 @router.get("/", response_model=List[MenuItemRead])
-def get_menu(db: Session = Depends(get_db)):
-    return list_menu_items(db)
+async def get_menu(
+    request: Request,
+    location_id: int = Depends(get_location_id),
+    db: DbSession = Depends(get_read_db),
+):
+    headers = read_validator_headers(db, get_version(menu_namespace(location_id)), str(location_id))
+    if is_not_modified(request, headers):
+        return not_modified_response(headers)
+    body = await run_db(db, list_menu_items_json, location_id)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+@router.get("/search", response_model=List[MenuItemRead])
+async def search_menu(
+    request: Request,
+    q: Optional[str] = Query(None, max_length=100),
+    category: Optional[str] = None,
+    tags: Optional[str] = None,
+    available: Optional[bool] = None,
+    limit: int = Query(DEFAULT_SEARCH_LIMIT, ge=1, le=MAX_SEARCH_LIMIT),
+    location_id: int = Depends(get_location_id),
+    # The index is stamped with the primary's menu version, so it is only ever rebuilt from the primary.
+    db: DbSession = Depends(get_db),
+):
+    headers = validator_headers(get_version(menu_namespace(location_id)), request.url.query)
+    if is_not_modified(request, headers):
+        return not_modified_response(headers)
+    tag_list = [tag.strip() for tag in tags.split(",") if tag.strip()] if tags else []
+    body = await run_db(db, search_menu_items_json, location_id, q, category, tag_list, available, limit)
+    return Response(content=body, media_type="application/json", headers=headers)
 
 
 @router.post("/", response_model=MenuItemRead, dependencies=[Depends(require_role({"admin", "staff"}))])
-def add_menu_item(item_in: MenuItemCreate, db: Session = Depends(get_db)):
-    return create_menu_item(db, item_in)
+async def add_menu_item(
+    item_in: MenuItemCreate,
+    location_id: int = Depends(get_location_id),
+    db: DbSession = Depends(get_db),
+):
+    return await run_db(db, create_menu_item, location_id, item_in)
 
 
-@router.post("/upload", dependencies=[Depends(require_role({"admin", "staff"}))])
-def upload_menu_image(file: UploadFile = File(...)):
-    if not file.content_type or not file.content_type.startswith("image/"):
-        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Invalid image type")
+@router.post("/bulk", response_model=MenuImportResult, dependencies=[Depends(require_role({"admin", "staff"}))])
+async def bulk_import_menu(
+    items: List[MenuItemCreate] = Body(..., max_length=settings.MENU_BULK_MAX_ITEMS),
+    location_id: int = Depends(get_location_id),
+    db: DbSession = Depends(get_db),
+):
+    return await run_db(db, bulk_upsert_menu_items, location_id, items)
+
 
-    extension = Path(file.filename).suffix or ".jpg"
-    file_name = f"{uuid4().hex}{extension}"
-    target = UPLOAD_DIR / file_name
-    with target.open("wb") as buffer:
-        buffer.write(file.file.read())
+@router.get("/export", dependencies=[Depends(require_role({"admin", "staff"}))])
+async def export_menu(format: Literal["jsonl", "csv"] = "jsonl", location_id: int = Depends(get_location_id)):
+    body = _export_async(format, location_id) if settings.DATABASE_ASYNC else _export_sync(format, location_id)
+    return StreamingResponse(
+        body,
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="menu.{format}"'},
+    )
 
+
+@router.post("/upload", dependencies=[Depends(require_role({"admin", "staff"}))])
+async def upload_menu_image(file: UploadFile = File(...)):
+    file_name = await run_in_threadpool(store_image, file.file, UPLOAD_DIR)
+    image_pipeline.submit(UPLOAD_DIR, file_name, "/uploads/menu")
     return {"url": f"/uploads/menu/{file_name}"}
 
 
 @router.put("/{item_id}", response_model=MenuItemRead, dependencies=[Depends(require_role({"admin", "staff"}))])
-def update_item(item_id: int, item_in: MenuItemUpdate, db: Session = Depends(get_db)):
-    item = get_menu_item(db, item_id)
+async def update_item(
+    item_id: int,
+    item_in: MenuItemUpdate,
+    location_id: int = Depends(get_location_id),
+    db: DbSession = Depends(get_db),
+):
+    item = await run_db(db, update_menu_item, location_id, item_id, item_in)
     if not item:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Menu item not found")
-    return update_menu_item(db, item, item_in)
+    return item
 
 
 @router.delete("/{item_id}", status_code=status.HTTP_204_NO_CONTENT, dependencies=[Depends(require_role({"admin", "staff"}))])
-def remove_item(item_id: int, db: Session = Depends(get_db)):
-    item = get_menu_item(db, item_id)
-    if not item:
+async def remove_item(item_id: int, location_id: int = Depends(get_location_id), db: DbSession = Depends(get_db)):
+    if not await run_db(db, delete_menu_item, location_id, item_id):
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Menu item not found")
-    delete_menu_item(db, item)
@@ -0,0 +1,13 @@
+from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
+
+from app.api.deps import require_role
+from app.core.metrics import metrics
+from app.db.pool import pool_metrics
+
+router = APIRouter(tags=["system"])
+
+
+@router.get("/metrics", include_in_schema=False, dependencies=[Depends(require_role({"admin"}))])
+async def read_metrics():
+    return PlainTextResponse(metrics.render(pool_metrics.snapshot()), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,86 @@
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+
+from app.api.deps import get_db, get_location_id, require_role
+from app.api.http_cache import is_not_modified, not_modified_response, validator_headers
+from app.api.idempotency import IdempotencyContext, idempotency_key
+from app.core.cache import get_version
+from app.core.kitchen import ORDER_STATUSES
+from app.crud.menu_item import menu_price_snapshot
+from app.crud.order import create_order, get_order, kitchen_tickets_json, orders_namespace, update_order_status
+from app.crud.reservation import get_reservation
+from app.db.session import DbSession, run_db
+from app.schemas.order import OrderCreate, OrderRead, OrderStatusUpdate
+
+router = APIRouter(prefix="/orders", tags=["orders"], dependencies=[Depends(require_role({"admin", "staff"}))])
+
+
+def _order_json(order: OrderRead) -> bytes:
+    return order.model_dump_json().encode()
+
+
+@router.post("/", response_model=OrderRead)
+async def place_order(
+    order_in: OrderCreate,
+    location_id: int = Depends(get_location_id),
+    db: DbSession = Depends(get_db),
+    idempotency: Optional[IdempotencyContext] = Depends(idempotency_key),
+):
+    prices = await run_db(db, menu_price_snapshot, location_id)
+    unknown = sorted({line.menu_item_id for line in order_in.lines if line.menu_item_id not in prices})
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Unknown menu items: {', '.join(map(str, unknown))}",
+        )
+    unavailable = sorted({prices[line.menu_item_id].name for line in order_in.lines if not prices[line.menu_item_id].is_available})
+    if unavailable:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Not available: {', '.join(unavailable)}",
+        )
+    if order_in.reservation_id is not None and not await run_db(
+        db, get_reservation, order_in.reservation_id, location_id
+    ):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Reservation not found")
+
+    before_commit = None if idempotency is None else idempotency.before_commit(_order_json)
+    order = await run_db(db, create_order, location_id, order_in, prices, before_commit=before_commit)
+    if idempotency is None:
+        return order
+    return idempotency.committed_response()
+
+
+@router.get("/kitchen", response_model=List[OrderRead])
+async def kitchen_queue_feed(
+    request: Request,
+    status_filter: Optional[str] = Query(None, alias="status"),
+    location_id: int = Depends(get_location_id),
+    db: DbSession = Depends(get_db),
+):
+    headers = validator_headers(get_version(orders_namespace(location_id)), request.url.query, private=True)
+    if is_not_modified(request, headers):
+        return not_modified_response(headers)
+    body = await run_db(db, kitchen_tickets_json, location_id, status_filter)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+@router.patch("/{order_id}/status", response_model=OrderRead)
+async def set_order_status(
+    order_id: int,
+    payload: OrderStatusUpdate,
+    location_id: int = Depends(get_location_id),
+    db: DbSession = Depends(get_db),
+):
+    if payload.status not in ORDER_STATUSES:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Status must be one of: {', '.join(ORDER_STATUSES)}",
+        )
+    order = await run_db(db, update_order_status, location_id, order_id, payload.status)
+    if order:
+        return order
+    if not await run_db(db, get_order, location_id, order_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Order not found")
+    raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Order is already closed")
@@ -0,0 +1,112 @@
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+
+from app.api.deps import get_location_id, get_read_db, require_role
+from app.api.http_cache import is_not_modified, not_modified_response, read_validator_headers
+from app.api.responses import FastJSONResponse
+from app.core.availability import ACTIVE_STATUSES
+from app.core.cache import get_version
+from app.crud.report import rollup_totals
+from app.crud.reservation import reservation_namespace
+from app.db.session import DbSession, run_db
+from app.schemas.report import HourlyReport, ReportSummary
+
+router = APIRouter(prefix="/reports", tags=["reports"], dependencies=[Depends(require_role({"admin"}))])
+
+DEFAULT_RANGE_DAYS = 30
+MAX_RANGE_DAYS = 366
+
+
+def _date_range(date_from: Optional[date], date_to: Optional[date]) -> Tuple[date, date]:
+    date_to = date_to or date.today()
+    date_from = date_from or date_to - timedelta(days=DEFAULT_RANGE_DAYS - 1)
+    if date_from > date_to:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="date_from is after date_to")
+    if (date_to - date_from).days >= MAX_RANGE_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Range is limited to {MAX_RANGE_DAYS} days",
+        )
+    return date_from, date_to
+
+
+def _totals(by_status: Dict[str, Tuple[int, int]]) -> dict:
+    reservations = sum(count for count, _ in by_status.values())
+    party_sizes = sum(covers for _, covers in by_status.values())
+    cancelled = by_status.get("cancelled", (0, 0))[0]
+    no_shows = by_status.get("no_show", (0, 0))[0]
+    return {
+        "reservations": reservations,
+        "covers": sum(by_status.get(name, (0, 0))[1] for name in ACTIVE_STATUSES),
+        "cancelled": cancelled,
+        "no_shows": no_shows,
+        "cancellation_rate": round(cancelled / reservations, 4) if reservations else 0.0,
+        "no_show_rate": round(no_shows / (reservations - cancelled), 4) if reservations > cancelled else 0.0,
+        "average_party_size": round(party_sizes / reservations, 2) if reservations else 0.0,
+    }
+
+
+def _grouped(rows) -> Dict:
+    groups: Dict = defaultdict(dict)
+    for key, row_status, count, covers in rows:
+        groups[key][row_status] = (int(count), int(covers))
+    return groups
+
+
+def _report_headers(db: DbSession, location_id: int, report: str, date_from: date, date_to: date) -> Dict[str, str]:
+    # Keyed on the resolved range: an omitted date_to means a new window every day even without writes.
+    return read_validator_headers(
+        db,
+        get_version(reservation_namespace(location_id)),
+        report,
+        date_from.isoformat(),
+        date_to.isoformat(),
+        private=True,
+    )
+
+
+@router.get("/reservations/summary", response_model=ReportSummary)
+async def reservation_summary(
+    request: Request,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    location_id: int = Depends(get_location_id),
+    db: DbSession = Depends(get_read_db),
+):
+    date_from, date_to = _date_range(date_from, date_to)
+    headers = _report_headers(db, location_id, "summary", date_from, date_to)
+    if is_not_modified(request, headers):
+        return not_modified_response(headers)
+    days = _grouped(await run_db(db, rollup_totals, location_id, date_from, date_to, "day"))
+    overall: Dict[str, List[int]] = defaultdict(lambda: [0, 0])
+    for by_status in days.values():
+        for row_status, (count, covers) in by_status.items():
+            overall[row_status][0] += count
+            overall[row_status][1] += covers
+    content = {
+        **_totals({key: tuple(value) for key, value in overall.items()}),
+        "date_from": date_from,
+        "date_to": date_to,
+        "days": [{"date": day, **_totals(by_status)} for day, by_status in sorted(days.items())],
+    }
+    return FastJSONResponse(content=content, headers=headers)
+
+
+@router.get("/reservations/hourly", response_model=List[HourlyReport])
+async def reservation_hourly(
+    request: Request,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    location_id: int = Depends(get_location_id),
+    db: DbSession = Depends(get_read_db),
+):
+    date_from, date_to = _date_range(date_from, date_to)
+    headers = _report_headers(db, location_id, "hourly", date_from, date_to)
+    if is_not_modified(request, headers):
+        return not_modified_response(headers)
+    hours = _grouped(await run_db(db, rollup_totals, location_id, date_from, date_to, "hour"))
+    content = [{"hour": hour, **_totals(by_status)} for hour, by_status in sorted(hours.items())]
+    return FastJSONResponse(content=content, headers=headers)
@@ -1,26 +1,152 @@
-from typing import List
+import time
+from datetime import date, datetime, timedelta
+from typing import AsyncIterator, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
 
-from app.api.deps import get_current_user_optional, get_db, require_role
+from app.api.deps import get_current_user_optional, get_db, get_location_id, get_read_db, require_role
+from app.api.http_cache import is_not_modified, not_modified_response, read_validator_headers
+from app.api.idempotency import IdempotencyContext, idempotency_key
+from app.api.pagination import decode_cursor, encode_cursor
+from app.api.rate_limit import rate_limit
+from app.api.responses import FastJSONResponse
+from app.core.availability import ACTIVE_STATUSES, NoCapacity, availability
+from app.core.cache import get_version
+from app.core.config import settings
+from app.core.events import event_broker
+from app.db.session import DbSession, release_db, run_db
 from app.crud.reservation import (
+    RESERVATION_CACHE_NAMESPACE,
     create_reservation,
     get_reservation,
     list_reservations,
-    list_reservations_for_user,
+    reactivate_reservation,
+    reservation_channel,
+    reservation_namespace,
     update_reservation_status,
 )
-from app.schemas.reservation import ReservationCreate, ReservationRead, ReservationUpdate
+from app.schemas.reservation import (
+    AvailabilityRead,
+    ReservationCreate,
+    ReservationFilter,
+    ReservationRead,
+    ReservationUpdate,
+)
 
 router = APIRouter(prefix="/reservations", tags=["reservations"])
 
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+_reservation_list_adapter = TypeAdapter(List[ReservationRead])
+
+
+async def reservation_filters(
+    status_filter: Optional[str] = Query(None, alias="status"),
+    reserved_from: Optional[datetime] = None,
+    reserved_to: Optional[datetime] = None,
+    min_party_size: Optional[int] = Query(None, ge=1),
+    max_party_size: Optional[int] = Query(None, ge=1),
+) -> ReservationFilter:
+    return ReservationFilter(
+        status=status_filter,
+        reserved_from=reserved_from,
+        reserved_to=reserved_to,
+        min_party_size=min_party_size,
+        max_party_size=max_party_size,
+    )
+
+
+def _parse_fields(fields: Optional[str]) -> List[str]:
+    if not fields:
+        return []
+    requested = list(dict.fromkeys(name.strip() for name in fields.split(",") if name.strip()))
+    unknown = [name for name in requested if name not in ReservationRead.model_fields]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Unknown fields: {', '.join(unknown)}",
+        )
+    return requested
+
+
+async def _reservation_page(
+    request: Request,
+    db: DbSession,
+    filters: ReservationFilter,
+    cursor: Optional[str],
+    limit: int,
+    fields: Optional[str],
+    location_id: Optional[int] = None,
+    user_id: Optional[int] = None,
+) -> Response:
+    if user_id is None:
+        headers = read_validator_headers(
+            db, get_version(reservation_namespace(location_id)), request.url.query, private=True
+        )
+    else:
+        headers = read_validator_headers(
+            db, get_version(RESERVATION_CACHE_NAMESPACE), request.url.query, str(user_id), private=True
+        )
+    if is_not_modified(request, headers):
+        return not_modified_response(headers)
+
+    requested = _parse_fields(fields)
+    columns = list(dict.fromkeys([*requested, "id", "created_at"])) if requested else None
+    rows = await run_db(
+        db,
+        list_reservations,
+        location_id,
+        filters,
+        user_id=user_id,
+        after=decode_cursor(cursor) if cursor else None,
+        limit=limit + 1,
+        fields=columns,
+    )
+    if len(rows) > limit:
+        rows = rows[:limit]
+        headers["X-Next-Cursor"] = encode_cursor(rows[-1].created_at, rows[-1].id)
+
+    if requested:
+        content = [{name: getattr(row, name) for name in requested} for row in rows]
+        return FastJSONResponse(content=content, headers=headers)
+    items = _reservation_list_adapter.validate_python(rows, from_attributes=True)
+    return Response(content=_reservation_list_adapter.dump_json(items), media_type="application/json", headers=headers)
+
+
+def _reservation_json(reservation) -> bytes:
+    return ReservationRead.model_validate(reservation).model_dump_json().encode()
+
+
+def _check_horizon(day: date) -> None:
+    today = datetime.now().date()
+    if not today <= day <= today + timedelta(days=settings.AVAILABILITY_MAX_DAYS_AHEAD):
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Date must be between today and {settings.AVAILABILITY_MAX_DAYS_AHEAD} days ahead",
+        )
+
 
-@router.post("/", response_model=ReservationRead)
-def make_reservation(
+def _no_table() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail="No table available for this time and party size",
+    )
+
+
+@router.post(
+    "/",
+    response_model=ReservationRead,
+    dependencies=[Depends(rate_limit("reservations", "RESERVATION_RATE_LIMIT_IP"))],
+)
+async def make_reservation(
     reservation_in: ReservationCreate,
-    db: Session = Depends(get_db),
+    location_id: int = Depends(get_location_id),
+    db: DbSession = Depends(get_db),
     current_user=Depends(get_current_user_optional),
+    idempotency: Optional[IdempotencyContext] = Depends(idempotency_key),
 ):
     if current_user is None:
         if not reservation_in.guest_name or not reservation_in.guest_email:
@@ -31,33 +157,126 @@ def make_reservation(
         user_id = None
     else:
         user_id = current_user.id
-    return create_reservation(db, reservation_in, user_id=user_id)
+    _check_horizon(reservation_in.reserved_for.date())
+    # The in-memory index only rejects early; create_reservation re-counts under a database lock.
+    if not await run_db(
+        db, availability.has_capacity, location_id, reservation_in.reserved_for, reservation_in.party_size
+    ):
+        raise _no_table()
+    before_commit = None if idempotency is None else idempotency.before_commit(_reservation_json)
+    try:
+        reservation = await run_db(
+            db, create_reservation, location_id, reservation_in, user_id=user_id, before_commit=before_commit
+        )
+    except NoCapacity:
+        raise _no_table()
+    if idempotency is None:
+        return reservation
+    return idempotency.committed_response()
+
+
+@router.get("/availability", response_model=AvailabilityRead)
+async def get_availability(
+    date: date,
+    party_size: int = Query(..., ge=1),
+    location_id: int = Depends(get_location_id),
+    db: DbSession = Depends(get_db),
+):
+    _check_horizon(date)
+    slots = await run_db(db, availability.free_slots, location_id, date, party_size)
+    return AvailabilityRead(date=date, party_size=party_size, slots=slots)
 
 
 @router.get("/", response_model=List[ReservationRead], dependencies=[Depends(require_role({"admin", "staff"}))])
-def list_all_reservations(db: Session = Depends(get_db)):
-    return list_reservations(db)
+async def list_all_reservations(
+    request: Request,
+    filters: ReservationFilter = Depends(reservation_filters),
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    fields: Optional[str] = None,
+    location_id: int = Depends(get_location_id),
+    db: DbSession = Depends(get_read_db),
+):
+    return await _reservation_page(request, db, filters, cursor, limit, fields, location_id=location_id)
+
+
+async def _reservation_events(channel: str, cursor: str, reset: bool) -> AsyncIterator[bytes]:
+    yield f"retry: {settings.RESERVATION_STREAM_RETRY_MS}\n\n".encode()
+    if reset:
+        yield f"id: {cursor}\nevent: reset\ndata: {{}}\n\n".encode()
+    max_seconds = settings.RESERVATION_STREAM_MAX_SECONDS
+    deadline = time.monotonic() + max_seconds if max_seconds else None
+    while True:
+        timeout = settings.RESERVATION_STREAM_HEARTBEAT_SECONDS
+        if deadline is not None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            timeout = min(timeout, remaining)
+        events = await event_broker.read(channel, cursor, timeout)
+        if not events:
+            yield b": keep-alive\n\n"
+            continue
+        cursor = events[-1][0]
+        yield b"".join(b"id: %s\ndata: %s\n\n" % (event_id.encode(), data) for event_id, data in events)
+
+
+@router.get("/stream", response_class=StreamingResponse, dependencies=[Depends(require_role({"admin", "staff"}))])
+async def stream_reservations(
+    last_event_id: Optional[str] = Header(None, alias="Last-Event-ID", max_length=64),
+    location_id: int = Depends(get_location_id),
+    db: DbSession = Depends(get_db),
+):
+    await release_db(db)
+    channel = reservation_channel(location_id)
+    cursor = None
+    if last_event_id:
+        cursor = await event_broker.resume(channel, last_event_id)
+    reset = bool(last_event_id) and cursor is None
+    if cursor is None:
+        cursor = await event_broker.tail(channel)
+    return StreamingResponse(
+        _reservation_events(channel, cursor, reset),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @router.get("/me", response_model=List[ReservationRead])
-def list_my_reservations(db: Session = Depends(get_db), current_user=Depends(require_role({"customer"}))):
-    return list_reservations_for_user(db, current_user.id)
+async def list_my_reservations(
+    request: Request,
+    filters: ReservationFilter = Depends(reservation_filters),
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    fields: Optional[str] = None,
+    db: DbSession = Depends(get_read_db),
+    current_user=Depends(require_role({"customer"})),
+):
+    return await _reservation_page(request, db, filters, cursor, limit, fields, user_id=current_user.id)
 
 
 @router.patch("/{reservation_id}/cancel", response_model=ReservationRead)
-def cancel_my_reservation(
+async def cancel_my_reservation(
     reservation_id: int,
-    db: Session = Depends(get_db),
+    db: DbSession = Depends(get_db),
     current_user=Depends(require_role({"customer"})),
 ):
-    reservation = get_reservation(db, reservation_id)
+    reservation = await run_db(
+        db,
+        update_reservation_status,
+        reservation_id,
+        "cancelled",
+        user_id=current_user.id,
+        unless_status="cancelled",
+    )
+    if reservation:
+        return reservation
+    reservation = await run_db(db, get_reservation, reservation_id)
     if not reservation:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Reservation not found")
     if reservation.user_id != current_user.id:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not allowed to cancel")
-    if reservation.status == "cancelled":
-        return reservation
-    return update_reservation_status(db, reservation, ReservationUpdate(status="cancelled"))
+    return reservation
 
 
 @router.patch(
@@ -65,19 +284,44 @@ def cancel_my_reservation(
     response_model=ReservationRead,
     dependencies=[Depends(require_role({"admin", "staff"}))],
 )
-def set_reservation_status(
+async def set_reservation_status(
     reservation_id: int,
     payload: ReservationUpdate,
-    db: Session = Depends(get_db),
+    location_id: int = Depends(get_location_id),
+    db: DbSession = Depends(get_db),
 ):
-    allowed = {"pending", "confirmed", "cancelled"}
+    allowed = {"pending", "confirmed", "cancelled", "no_show"}
     if payload.status not in allowed:
         raise HTTPException(
             status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
             detail=f"Status must be one of: {', '.join(sorted(allowed))}",
         )
 
-    reservation = get_reservation(db, reservation_id)
+    if payload.status not in ACTIVE_STATUSES:
+        reservation = await run_db(db, update_reservation_status, reservation_id, payload.status, location_id)
+    else:
+        reservation = await _reactivate(db, reservation_id, payload.status, location_id)
     if not reservation:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Reservation not found")
-    return update_reservation_status(db, reservation, payload)
+    return reservation
+
+
+async def _reactivate(db: DbSession, reservation_id: int, new_status: str, location_id: int):
+    reservation = await run_db(
+        db, update_reservation_status, reservation_id, new_status, location_id, from_statuses=ACTIVE_STATUSES
+    )
+    if reservation is not None:
+        return reservation
+    current = await run_db(db, get_reservation, reservation_id, location_id)
+    if current is None:
+        return None
+    if current.status in ACTIVE_STATUSES:
+        return await run_db(db, update_reservation_status, reservation_id, new_status, location_id)
+    # A cancelled or no-show booking takes a table again, so it goes through the same checks as a new one.
+    _check_horizon(current.reserved_for.date())
+    if not await run_db(db, availability.has_capacity, location_id, current.reserved_for, current.party_size):
+        raise _no_table()
+    try:
+        return await run_db(db, reactivate_reservation, current, new_status)
+    except NoCapacity:
+        raise _no_table()
@@ -0,0 +1,13 @@
+from fastapi import APIRouter, Depends
+
+from app.api.deps import require_role
+from app.db.pool import pool_metrics
+from app.db.session import async_engine, engine
+
+router = APIRouter(prefix="/system", tags=["system"])
+
+
+@router.get("/db-pool", dependencies=[Depends(require_role({"admin"}))])
+async def read_db_pool():
+    active_engine = async_engine.sync_engine if async_engine is not None else engine
+    return {"pool": active_engine.pool.status(), **pool_metrics.snapshot()}
@@ -0,0 +1,241 @@
+import bisect
+import threading
+from collections import OrderedDict, defaultdict
+from datetime import date, datetime, time, timedelta
+from time import monotonic
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.reservation import Reservation
+
+ACTIVE_STATUSES = ("pending", "confirmed")
+
+DayKey = Tuple[int, date]
+
+
+def parse_table_layout(layout: str) -> Dict[int, int]:
+    tables: Dict[int, int] = defaultdict(int)
+    for entry in layout.split(","):
+        if entry.strip():
+            seats, count = entry.split(":")
+            tables[int(seats)] += int(count)
+    return dict(tables)
+
+
+def _parse_hours(hours: str) -> Tuple[time, time]:
+    opens, closes = hours.split("-")
+    return time.fromisoformat(opens.strip()), time.fromisoformat(closes.strip())
+
+
+def _wall_clock(value: datetime) -> datetime:
+    return value.replace(tzinfo=None)
+
+
+class NoCapacity(Exception):
+    pass
+
+
+def lock_booking_day(db: Session, location_id: int, day: date) -> None:
+    # Serialises every writer for the day across workers until the caller commits or rolls back.
+    connection = db.connection()
+    if connection.dialect.name == "sqlite":
+        # pysqlite defers BEGIN to the first write, so take the database write lock before re-counting.
+        connection.exec_driver_sql("BEGIN IMMEDIATE")
+    elif connection.dialect.name == "postgresql":
+        connection.execute(select(func.pg_advisory_xact_lock(location_id, day.toordinal())))
+
+
+class AvailabilityIndex:
+    def __init__(
+        self,
+        tables: Dict[int, int],
+        turn_minutes: int,
+        slot_minutes: int,
+        opens: time,
+        closes: time,
+        max_days: int = 512,
+        ttl: float = 30,
+    ):
+        self.sizes = sorted(tables)
+        self.tables = [tables[size] for size in self.sizes]
+        self.slot = timedelta(minutes=slot_minutes)
+        self.turn = timedelta(minutes=turn_minutes)
+        self.turn_slots = -(-turn_minutes // slot_minutes)
+        self.opens = opens
+        self.closes = closes
+        day_minutes = (
+            datetime.combine(date.min, closes) - datetime.combine(date.min, opens)
+        ).total_seconds() // 60
+        self.slots_per_day = int(day_minutes // slot_minutes)
+        self.max_days = max_days
+        self.ttl = ttl
+        # Loaded days are kept in LRU order and reloaded after ttl seconds, so bookings written by other
+        # workers show up; the booking transaction itself always re-counts from the database.
+        self._days: "OrderedDict[DayKey, List[List[int]]]" = OrderedDict()
+        self._members: Dict[DayKey, Dict[int, Tuple[int, int, int]]] = {}
+        self._loaded_at: Dict[DayKey, float] = {}
+        # Bumped by every change to a day that is not loaded, so an in-flight load knows to retry.
+        self._generation = 0
+        self._lock = threading.RLock()
+
+    def table_class(self, party_size: int) -> Optional[int]:
+        index = bisect.bisect_left(self.sizes, party_size)
+        return index if index < len(self.sizes) else None
+
+    def _span(self, start: datetime) -> Tuple[date, int, int]:
+        start = _wall_clock(start)
+        day_start = datetime.combine(start.date(), self.opens)
+        first = (start - day_start) // self.slot
+        last = -(-(start + self.turn - day_start) // self.slot)
+        return start.date(), first, last
+
+    def _forget(self, key: DayKey) -> None:
+        self._days.pop(key, None)
+        self._members.pop(key, None)
+        self._loaded_at.pop(key, None)
+
+    def _load(self, db: Session, location_id: int, day: date, fresh: bool = False) -> List[List[int]]:
+        key = (location_id, day)
+        while True:
+            with self._lock:
+                if key in self._days:
+                    if not fresh and monotonic() - self._loaded_at[key] < self.ttl:
+                        self._days.move_to_end(key)
+                        return self._days[key]
+                    self._forget(key)
+                fresh = False
+                generation = self._generation
+            window_start = datetime.combine(day, self.opens) - self.turn
+            window_end = datetime.combine(day, self.closes)
+            rows = (
+                db.query(Reservation.id, Reservation.party_size, Reservation.reserved_for)
+                .filter(
+                    Reservation.location_id == location_id,
+                    Reservation.status.in_(ACTIVE_STATUSES),
+                    Reservation.reserved_for >= window_start,
+                    Reservation.reserved_for < window_end,
+                )
+                .all()
+            )
+            with self._lock:
+                if key in self._days:
+                    return self._days[key]
+                if self._generation != generation:
+                    continue
+                self._days[key] = [[0] * len(self.sizes) for _ in range(self.slots_per_day)]
+                self._members[key] = {}
+                self._loaded_at[key] = monotonic()
+                for row in rows:
+                    self._track(location_id, row.id, row.party_size, row.reserved_for, day_filter=day)
+                while len(self._days) > self.max_days:
+                    self._forget(next(iter(self._days)))
+                return self._days[key]
+
+    def _track(
+        self,
+        location_id: int,
+        reservation_id: int,
+        party_size: int,
+        start: datetime,
+        day_filter: Optional[date] = None,
+    ) -> None:
+        day, first, last = self._span(start)
+        if day_filter is not None and day != day_filter:
+            return
+        key = (location_id, day)
+        first, last = max(first, 0), min(last, self.slots_per_day)
+        members = self._members.get(key)
+        cls = self.table_class(party_size)
+        if members is None:
+            self._generation += 1
+            return
+        if reservation_id in members or cls is None or first >= last:
+            return
+        members[reservation_id] = (first, last, cls)
+        slots = self._days[key]
+        for index in range(first, last):
+            slots[index][cls] += 1
+
+    def _untrack(self, location_id: int, reservation_id: int, start: datetime) -> None:
+        key = (location_id, _wall_clock(start).date())
+        members = self._members.get(key)
+        if members is None:
+            self._generation += 1
+            return
+        if reservation_id not in members:
+            return
+        first, last, cls = members.pop(reservation_id)
+        slots = self._days[key]
+        for index in range(first, last):
+            slots[index][cls] -= 1
+
+    def _fits(self, slots: List[List[int]], first: int, last: int, cls: int) -> bool:
+        for index in range(first, last):
+            demand = 0
+            supply = 0
+            for size_index in range(len(self.sizes) - 1, -1, -1):
+                demand += slots[index][size_index] + (1 if size_index == cls else 0)
+                supply += self.tables[size_index]
+                if demand > supply:
+                    return False
+        return True
+
+    def has_capacity(
+        self, db: Session, location_id: int, start: datetime, party_size: int, fresh: bool = False
+    ) -> bool:
+        cls = self.table_class(party_size)
+        day, first, last = self._span(start)
+        if cls is None or first < 0 or last > self.slots_per_day:
+            return False
+        slots = self._load(db, location_id, day, fresh=fresh)
+        with self._lock:
+            return self._fits(slots, first, last, cls)
+
+    def claim(self, db: Session, location_id: int, start: datetime, party_size: int) -> None:
+        lock_booking_day(db, location_id, _wall_clock(start).date())
+        if not self.has_capacity(db, location_id, start, party_size, fresh=True):
+            db.rollback()
+            raise NoCapacity()
+
+    def free_slots(self, db: Session, location_id: int, day: date, party_size: int) -> List[datetime]:
+        cls = self.table_class(party_size)
+        if cls is None:
+            return []
+        slots = self._load(db, location_id, day)
+        opens = datetime.combine(day, self.opens)
+        with self._lock:
+            return [
+                opens + index * self.slot
+                for index in range(self.slots_per_day - self.turn_slots + 1)
+                if self._fits(slots, index, index + self.turn_slots, cls)
+            ]
+
+    def add(self, reservation: Reservation) -> None:
+        if reservation.status not in ACTIVE_STATUSES:
+            return
+        with self._lock:
+            self._track(reservation.location_id, reservation.id, reservation.party_size, reservation.reserved_for)
+
+    def remove(self, reservation: Reservation) -> None:
+        with self._lock:
+            self._untrack(reservation.location_id, reservation.id, reservation.reserved_for)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._days.clear()
+            self._members.clear()
+            self._loaded_at.clear()
+            self._generation += 1
+
+
+availability = AvailabilityIndex(
+    parse_table_layout(settings.TABLE_LAYOUT),
+    settings.TURN_DURATION_MINUTES,
+    settings.SLOT_INTERVAL_MINUTES,
+    *_parse_hours(settings.SERVICE_HOURS),
+    max_days=settings.AVAILABILITY_CACHE_DAYS,
+    ttl=settings.AVAILABILITY_CACHE_SECONDS,
+)
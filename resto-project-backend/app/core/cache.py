@@ -0,0 +1,118 @@
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Optional, Tuple
+from uuid import uuid4
+
+from app.core.config import settings
+
+
+class MemoryCache:
+    def __init__(self, max_entries: Optional[int] = 512):
+        self.max_entries = max_entries
+        self._data: "OrderedDict[str, Tuple[bytes, Optional[float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def _store(self, key: str, value: bytes, ttl: Optional[int]) -> None:
+        self._data[key] = (value, time.monotonic() + ttl if ttl else None)
+        self._data.move_to_end(key)
+        while self.max_entries is not None and len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+
+    def set(self, key: str, value: bytes, ttl: Optional[int] = None) -> None:
+        with self._lock:
+            self._store(key, value, ttl)
+
+    def add(self, key: str, value: bytes, ttl: Optional[int] = None) -> bool:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and (entry[1] is None or entry[1] > time.monotonic()):
+                return False
+            self._store(key, value, ttl)
+            return True
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+class RedisCache:
+    def __init__(self, url: str, prefix: str = "resto:"):
+        try:
+            import redis
+        except ImportError as exc:
+            raise RuntimeError("CACHE_BACKEND=redis requires the 'redis' package") from exc
+        self._client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self._client.get(self.prefix + key)
+
+    def set(self, key: str, value: bytes, ttl: Optional[int] = None) -> None:
+        self._client.set(self.prefix + key, value, ex=ttl)
+
+    def add(self, key: str, value: bytes, ttl: Optional[int] = None) -> bool:
+        return bool(self._client.set(self.prefix + key, value, ex=ttl, nx=True))
+
+    def delete(self, key: str) -> None:
+        self._client.delete(self.prefix + key)
+
+    def clear(self) -> None:
+        keys = list(self._client.scan_iter(match=f"{self.prefix}*"))
+        if keys:
+            self._client.delete(*keys)
+
+
+def build_cache(name: str, max_entries: Optional[int]):
+    if settings.CACHE_BACKEND == "redis":
+        return RedisCache(settings.CACHE_URL, prefix=f"resto:{name}:")
+    return MemoryCache(max_entries=max_entries)
+
+
+# Kept apart so per-user entries cannot evict response bodies, and nothing evicts a version: a
+# recreated version would change every ETag built on it.
+cache = build_cache("body", settings.CACHE_MAX_ENTRIES)
+session_cache = build_cache("session", settings.SESSION_CACHE_MAX_ENTRIES)
+version_cache = build_cache("version", None)
+
+
+def get_version(namespace: str) -> str:
+    key = f"{namespace}:version"
+    version = version_cache.get(key)
+    if version is None:
+        candidate = _new_version().encode()
+        if not version_cache.add(key, candidate):
+            version = version_cache.get(key)
+        version = version or candidate
+    return version.decode()
+
+
+def bump_version(namespace: str) -> str:
+    version = _new_version()
+    version_cache.set(f"{namespace}:version", version.encode())
+    return version
+
+
+def version_timestamp(version: str) -> datetime:
+    return datetime.fromtimestamp(int(version.split("-", 1)[0]), tz=timezone.utc)
+
+
+def _new_version() -> str:
+    return f"{int(time.time())}-{uuid4().hex}"
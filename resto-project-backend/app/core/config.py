@@ -5,10 +5,83 @@ class Settings(BaseSettings):
     APP_NAME: str = "Resto API"
     API_V1_STR: str = "/api/v1"
     DATABASE_URL: str = "sqlite:///./resto.db"
+    DATABASE_ASYNC: bool = False
+    DATABASE_ASYNC_URL: str = ""
+    DATABASE_READ_URLS: str = ""
+    DATABASE_MIGRATE_ON_STARTUP: bool = False
+    READ_REPLICA_RETRY_SECONDS: int = 30
+    READ_REPLICA_MAX_LAG_SECONDS: int = 5
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    SQLITE_WAL: bool = True
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_CACHE_SIZE_KB: int = 20000
+    SQLITE_MMAP_SIZE: int = 268435456
+    DEFAULT_LOCATION_ID: int = 1
+    LOCATION_MISS_TTL: int = 30
+    DEFAULT_LOCATION_NAME: str = "Main"
     BACKEND_CORS_ORIGINS: str = "http://localhost:8080"
     SECRET_KEY: str = "change-me"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
+    AUTH_STATELESS: bool = True
+    AUTH_STATE_TTL: int = 30
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_EXECUTOR: str = "thread"
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_PENDING: int = 64
+    PASSWORD_HASH_RETRY_AFTER: int = 1
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_BACKEND: str = "memory"
+    RATE_LIMIT_URL: str = ""
+    RATE_LIMIT_MAX_KEYS: int = 100000
+    RATE_LIMIT_TRUST_FORWARDED: bool = False
+    LOGIN_RATE_LIMIT_IP: str = "30/minute"
+    LOGIN_RATE_LIMIT_EMAIL: str = "5/minute"
+    SIGNUP_RATE_LIMIT_IP: str = "10/hour"
+    RESERVATION_RATE_LIMIT_IP: str = "20/minute"
+    IDEMPOTENCY_TTL_SECONDS: int = 86400
+    IDEMPOTENCY_LOCK_SECONDS: int = 60
+    IDEMPOTENCY_PURGE_INTERVAL_SECONDS: int = 300
+    EVENTS_BACKEND: str = "memory"
+    EVENTS_URL: str = ""
+    EVENTS_BUFFER_SIZE: int = 1000
+    RESERVATION_STREAM_HEARTBEAT_SECONDS: float = 15
+    RESERVATION_STREAM_MAX_SECONDS: float = 300
+    RESERVATION_STREAM_RETRY_MS: int = 3000
+    CACHE_BACKEND: str = "memory"
+    CACHE_URL: str = "redis://localhost:6379/0"
+    CACHE_MAX_ENTRIES: int = 512
+    SESSION_CACHE_MAX_ENTRIES: int = 10000
+    MENU_CACHE_TTL: int = 3600
+    MAX_UPLOAD_BYTES: int = 10 * 1024 * 1024
+    MAX_REQUEST_BYTES: int = 11 * 1024 * 1024
+    UPLOAD_CHUNK_SIZE: int = 1024 * 1024
+    IMAGE_VARIANT_WIDTHS: str = "320,640,1280"
+    IMAGE_VARIANT_FORMATS: str = "avif,webp"
+    IMAGE_WORKERS: int = 2
+    UPLOADS_MAX_AGE: int = 31536000
+    UPLOADS_STAT_CACHE_SIZE: int = 4096
+    UPLOADS_STAT_TTL: float = 5
+    RESPONSE_COMPRESSION: bool = True
+    COMPRESSION_MIN_SIZE: int = 1024
+    GZIP_LEVEL: int = 6
+    BROTLI_QUALITY: int = 4
+    MENU_BULK_MAX_ITEMS: int = 20000
+    SERVER_TIMING: bool = True
+    METRICS_ENABLED: bool = False
+    SLOW_QUERY_MS: float = 200
+    TABLE_LAYOUT: str = "2:4,4:6,6:2"
+    SERVICE_HOURS: str = "11:00-23:00"
+    TURN_DURATION_MINUTES: int = 90
+    SLOT_INTERVAL_MINUTES: int = 15
+    AVAILABILITY_MAX_DAYS_AHEAD: int = 180
+    AVAILABILITY_CACHE_DAYS: int = 512
+    AVAILABILITY_CACHE_SECONDS: float = 30
 
     model_config = SettingsConfigDict(env_file=".env", case_sensitive=True)
 
@@ -0,0 +1,143 @@
+import asyncio
+import threading
+import time
+from collections import defaultdict, deque
+from typing import Deque, Dict, List, Optional, Set, Tuple
+
+from app.core.config import settings
+
+Event = Tuple[str, bytes]
+
+
+def _parse_event_id(event_id: str) -> Optional[Tuple[int, int]]:
+    epoch, _, seq = event_id.partition("-")
+    try:
+        return int(epoch), int(seq or 0)
+    except ValueError:
+        return None
+
+
+class MemoryEventBroker:
+    def __init__(self, buffer_size: int = 1000):
+        self.buffer_size = buffer_size
+        self.epoch = int(time.time() * 1000)
+        self._events: Dict[str, Deque[Tuple[int, Event]]] = defaultdict(lambda: deque(maxlen=self.buffer_size))
+        self._seq: Dict[str, int] = defaultdict(int)
+        self._waiters: Dict[str, Set[Tuple[asyncio.AbstractEventLoop, asyncio.Event]]] = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def publish(self, channel: str, data: bytes) -> str:
+        with self._lock:
+            self._seq[channel] += 1
+            seq = self._seq[channel]
+            event_id = f"{self.epoch}-{seq}"
+            self._events[channel].append((seq, (event_id, data)))
+            waiters = self._waiters.pop(channel, ())
+        for loop, waiter in waiters:
+            try:
+                loop.call_soon_threadsafe(waiter.set)
+            except RuntimeError:
+                pass
+        return event_id
+
+    async def tail(self, channel: str) -> str:
+        with self._lock:
+            return f"{self.epoch}-{self._seq[channel]}"
+
+    async def resume(self, channel: str, last_id: str) -> Optional[str]:
+        if last_id == "0":
+            return f"{self.epoch}-0"
+        parsed = _parse_event_id(last_id)
+        with self._lock:
+            buffered = self._events[channel]
+            oldest = buffered[0][0] if buffered else self._seq[channel] + 1
+            if parsed is None or parsed[0] != self.epoch or not oldest - 1 <= parsed[1] <= self._seq[channel]:
+                return None
+        return last_id
+
+    def _after(self, channel: str, cursor: str) -> List[Event]:
+        after = _parse_event_id(cursor)[1]
+        events = []
+        for seq, event in reversed(self._events[channel]):
+            if seq <= after:
+                break
+            events.append(event)
+        events.reverse()
+        return events
+
+    async def read(self, channel: str, cursor: str, timeout: float) -> List[Event]:
+        waiter = (asyncio.get_running_loop(), asyncio.Event())
+        with self._lock:
+            events = self._after(channel, cursor)
+            if events:
+                return events
+            self._waiters[channel].add(waiter)
+        try:
+            await asyncio.wait_for(waiter[1].wait(), timeout)
+        except asyncio.TimeoutError:
+            return []
+        finally:
+            with self._lock:
+                self._waiters[channel].discard(waiter)
+        with self._lock:
+            return self._after(channel, cursor)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._events.clear()
+            self._seq.clear()
+
+
+class RedisEventBroker:
+    def __init__(self, url: str, buffer_size: int = 1000, prefix: str = "resto:events:"):
+        try:
+            import redis
+            import redis.asyncio
+        except ImportError as exc:
+            raise RuntimeError("EVENTS_BACKEND=redis requires the 'redis' package") from exc
+        self._client = redis.Redis.from_url(url)
+        self._async_client = redis.asyncio.Redis.from_url(url)
+        self.buffer_size = buffer_size
+        self.prefix = prefix
+
+    def publish(self, channel: str, data: bytes) -> str:
+        event_id = self._client.xadd(self.prefix + channel, {"data": data}, maxlen=self.buffer_size, approximate=True)
+        return event_id.decode()
+
+    async def tail(self, channel: str) -> str:
+        latest = await self._async_client.xrevrange(self.prefix + channel, count=1)
+        return latest[0][0].decode() if latest else "0-0"
+
+    async def resume(self, channel: str, last_id: str) -> Optional[str]:
+        if last_id == "0":
+            return "0-0"
+        stream = self.prefix + channel
+        try:
+            if await self._async_client.xrange(stream, min=last_id, max=last_id, count=1):
+                return last_id
+            oldest = await self._async_client.xrange(stream, count=1)
+        except Exception:
+            return None
+        if not oldest:
+            return last_id
+        return None
+
+    async def read(self, channel: str, cursor: str, timeout: float) -> List[Event]:
+        response = await self._async_client.xread({self.prefix + channel: cursor}, block=int(timeout * 1000))
+        if not response:
+            return []
+        return [(event_id.decode(), fields[b"data"]) for event_id, fields in response[0][1]]
+
+    def clear(self) -> None:
+        keys = list(self._client.scan_iter(match=f"{self.prefix}*"))
+        if keys:
+            self._client.delete(*keys)
+
+
+def build_event_broker():
+    if settings.EVENTS_BACKEND == "redis":
+        return RedisEventBroker(settings.EVENTS_URL or settings.CACHE_URL, buffer_size=settings.EVENTS_BUFFER_SIZE)
+    return MemoryEventBroker(buffer_size=settings.EVENTS_BUFFER_SIZE)
+
+
+event_broker = build_event_broker()
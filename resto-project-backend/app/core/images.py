@@ -0,0 +1,155 @@
+import json
+import logging
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+UPLOADS_ROOT = Path("uploads")
+VARIANTS_DIR = "variants"
+SAVE_OPTIONS = {
+    "webp": {"quality": 80, "method": 4},
+    "avif": {"quality": 60},
+    "jpeg": {"quality": 82, "optimize": True, "progressive": True},
+}
+
+
+def _parse_list(value: str) -> List[str]:
+    return [entry.strip() for entry in value.split(",") if entry.strip()]
+
+
+def supported_formats(formats: List[str]) -> List[str]:
+    try:
+        from PIL import features
+    except ImportError:
+        return []
+    return [fmt for fmt in formats if fmt == "jpeg" or features.check(fmt)]
+
+
+def _manifest_path(directory: Path, file_name: str) -> Path:
+    return directory / VARIANTS_DIR / f"{Path(file_name).stem}.json"
+
+
+def generate_variants(
+    directory: Path, file_name: str, url_prefix: str, widths: List[int], formats: List[str]
+) -> Dict[str, str]:
+    from PIL import Image, ImageOps
+
+    variant_dir = directory / VARIANTS_DIR
+    variant_dir.mkdir(parents=True, exist_ok=True)
+    stem = Path(file_name).stem
+    srcset: Dict[str, str] = {}
+    with Image.open(directory / file_name) as original:
+        image = ImageOps.exif_transpose(original)
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if image.mode in ("LA", "P") else "RGB")
+        for fmt in formats:
+            entries = []
+            for width in sorted({min(width, image.width) for width in widths}):
+                name = f"{stem}-{width}w.{fmt}"
+                target = variant_dir / name
+                if not target.exists():
+                    height = max(1, round(image.height * width / image.width))
+                    resized = image if width == image.width else image.resize((width, height), Image.LANCZOS)
+                    if fmt == "jpeg" and resized.mode == "RGBA":
+                        resized = resized.convert("RGB")
+                    temp = target.with_name(f".{name}.tmp")
+                    resized.save(temp, format=fmt.upper(), **SAVE_OPTIONS.get(fmt, {}))
+                    os.replace(temp, target)
+                entries.append(f"{url_prefix}/{VARIANTS_DIR}/{name} {width}w")
+            srcset[fmt] = ", ".join(entries)
+
+    manifest = _manifest_path(directory, file_name)
+    temp = manifest.with_name(f".{manifest.name}.tmp")
+    temp.write_text(json.dumps(srcset))
+    os.replace(temp, manifest)
+    return srcset
+
+
+def srcset_for(image_url: Optional[str]) -> Optional[Dict[str, str]]:
+    if not image_url or not image_url.startswith("/uploads/"):
+        return None
+    path = UPLOADS_ROOT / image_url[len("/uploads/"):]
+    try:
+        return json.loads(_manifest_path(path.parent, path.name).read_text())
+    except (OSError, ValueError):
+        return None
+
+
+def _record_variants(image_url: str, srcset: Dict[str, str]) -> None:
+    from app.crud.menu_item import set_image_srcset
+    from app.db.session import SessionLocal
+
+    db = SessionLocal()
+    try:
+        set_image_srcset(db, image_url, srcset)
+    finally:
+        db.close()
+
+
+class ImagePipeline:
+    def __init__(self, widths: List[int], formats: List[str], workers: int):
+        self.widths = widths
+        self.requested_formats = formats
+        self._formats: Optional[List[str]] = None
+        self.workers = workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending: Set[Future] = set()
+        self._lock = threading.Lock()
+
+    @property
+    def formats(self) -> List[str]:
+        # Probing Pillow's codecs imports it; defer that until the first upload.
+        if self._formats is None:
+            self._formats = supported_formats(self.requested_formats)
+        return self._formats
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.widths and self.workers > 0 and self.formats)
+
+    def _run(self, directory: Path, file_name: str, url_prefix: str) -> None:
+        try:
+            srcset = generate_variants(directory, file_name, url_prefix, self.widths, self.formats)
+            _record_variants(f"{url_prefix}/{file_name}", srcset)
+        except Exception:
+            logger.exception("Failed to build image variants for %s", file_name)
+
+    def submit(self, directory: Path, file_name: str, url_prefix: str) -> Optional[Future]:
+        if not self.enabled:
+            return None
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="image-variants")
+            future = self._executor.submit(self._run, directory, file_name, url_prefix)
+            self._pending.add(future)
+        future.add_done_callback(self._discard)
+        return future
+
+    def _discard(self, future: Future) -> None:
+        with self._lock:
+            self._pending.discard(future)
+
+    def drain(self, timeout: Optional[float] = None) -> None:
+        with self._lock:
+            pending = list(self._pending)
+        for future in pending:
+            future.result(timeout=timeout)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+
+image_pipeline = ImagePipeline(
+    [int(width) for width in _parse_list(settings.IMAGE_VARIANT_WIDTHS)],
+    _parse_list(settings.IMAGE_VARIANT_FORMATS),
+    settings.IMAGE_WORKERS,
+)
@@ -0,0 +1,55 @@
+import threading
+from collections import OrderedDict
+from typing import Iterable, NamedTuple, Optional, Sequence
+
+from app.core.partitions import Partitioned
+
+OPEN_ORDER_STATUSES = ("open", "preparing", "ready")
+ORDER_STATUSES = (*OPEN_ORDER_STATUSES, "served", "cancelled")
+
+
+class Ticket(NamedTuple):
+    order_id: int
+    status: str
+    body: bytes
+
+
+class KitchenQueue:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.clear()
+
+    def _put(self, ticket: Ticket) -> None:
+        if ticket.status in OPEN_ORDER_STATUSES:
+            self._tickets[ticket.order_id] = ticket
+        else:
+            self._tickets.pop(ticket.order_id, None)
+
+    def load(self, tickets: Iterable[Ticket], version: str) -> None:
+        with self._lock:
+            self._tickets.clear()
+            for ticket in tickets:
+                self._put(ticket)
+            self.version = version
+
+    def apply(self, previous: str, version: str, tickets: Sequence[Ticket]) -> None:
+        with self._lock:
+            if self.version != previous:
+                self.version = None
+                return
+            for ticket in tickets:
+                self._put(ticket)
+            self.version = version
+
+    def snapshot(self, status: Optional[str] = None) -> bytes:
+        with self._lock:
+            bodies = [ticket.body for ticket in self._tickets.values() if status is None or ticket.status == status]
+        return b"[" + b",".join(bodies) + b"]"
+
+    def clear(self) -> None:
+        with self._lock:
+            self._tickets: "OrderedDict[int, Ticket]" = OrderedDict()
+            self.version: Optional[str] = None
+
+
+kitchen_queue: Partitioned[KitchenQueue] = Partitioned(KitchenQueue)
@@ -0,0 +1,191 @@
+import bisect
+import re
+import threading
+import unicodedata
+from collections import defaultdict
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Set
+
+from app.core.partitions import Partitioned
+from app.models.menu_item import MenuItem
+from app.schemas.menu_item import MenuItemRead
+
+FIELD_WEIGHTS = (("name", 3.0), ("category", 2.0), ("tags", 2.0), ("description", 1.0))
+PREFIX_WEIGHT = 0.5
+NAME_PREFIX_BONUS = 5.0
+
+_TOKEN = re.compile(r"\w+")
+
+
+def normalize(text: Optional[str]) -> str:
+    if not text:
+        return ""
+    if text.isascii():
+        return text.lower()
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(char for char in decomposed if not unicodedata.combining(char)).lower()
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    return _TOKEN.findall(normalize(text))
+
+
+class SearchDocument(NamedTuple):
+    name: str
+    category: str
+    tags: frozenset
+    is_available: bool
+    terms: Dict[str, float]
+    body: bytes
+
+
+def _document(item: MenuItem) -> SearchDocument:
+    tags = item.tags or []
+    fields = {
+        "name": item.name,
+        "category": item.category,
+        "tags": " ".join(tags),
+        "description": item.description,
+    }
+    terms: Dict[str, float] = defaultdict(float)
+    for field, weight in FIELD_WEIGHTS:
+        for term in set(tokenize(fields[field])):
+            terms[term] += weight
+    return SearchDocument(
+        name=normalize(item.name),
+        category=normalize(item.category),
+        tags=frozenset(normalize(tag) for tag in tags),
+        is_available=item.is_available,
+        terms=dict(terms),
+        body=MenuItemRead.model_validate(item).model_dump_json().encode(),
+    )
+
+
+class MenuSearchIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.clear()
+
+    def _add(self, item_id: int, document: SearchDocument) -> None:
+        self._remove(item_id)
+        self._docs[item_id] = document
+        for term, weight in document.terms.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+                bisect.insort(self._terms, term)
+            postings[item_id] = weight
+        self._categories[document.category].add(item_id)
+        for tag in document.tags:
+            self._tags[tag].add(item_id)
+
+    def _remove(self, item_id: int) -> None:
+        document = self._docs.pop(item_id, None)
+        if document is None:
+            return
+        for term in document.terms:
+            postings = self._postings[term]
+            postings.pop(item_id, None)
+            if not postings:
+                del self._postings[term]
+                del self._terms[bisect.bisect_left(self._terms, term)]
+        self._categories[document.category].discard(item_id)
+        for tag in document.tags:
+            self._tags[tag].discard(item_id)
+
+    def load(self, items: Iterable[MenuItem], version: str) -> None:
+        documents = [(item.id, _document(item)) for item in items]
+        with self._lock:
+            self._reset()
+            for item_id, document in documents:
+                self._add(item_id, document)
+            self.version = version
+
+    def apply(
+        self,
+        previous: str,
+        version: str,
+        upserted: Sequence[MenuItem] = (),
+        removed: Sequence[int] = (),
+    ) -> None:
+        documents = [(item.id, _document(item)) for item in upserted]
+        with self._lock:
+            if self.version != previous:
+                self.version = None
+                return
+            for item_id in removed:
+                self._remove(item_id)
+            for item_id, document in documents:
+                self._add(item_id, document)
+            self.version = version
+
+    def _match(self, token: str) -> Dict[int, float]:
+        scores: Dict[int, float] = {}
+        start = bisect.bisect_left(self._terms, token)
+        for term in self._terms[start:]:
+            if not term.startswith(token):
+                break
+            factor = 1.0 if term == token else PREFIX_WEIGHT
+            for item_id, weight in self._postings[term].items():
+                scores[item_id] = max(scores.get(item_id, 0.0), weight * factor)
+        return scores
+
+    def _filtered(self, category: Optional[str], tags: Sequence[str]) -> Optional[Set[int]]:
+        candidates = None
+        if category:
+            candidates = set(self._categories.get(normalize(category), ()))
+        for tag in tags:
+            tagged = self._tags.get(normalize(tag), set())
+            candidates = set(tagged) if candidates is None else candidates & tagged
+        return candidates
+
+    def search(
+        self,
+        query: Optional[str] = None,
+        category: Optional[str] = None,
+        tags: Sequence[str] = (),
+        available: Optional[bool] = None,
+        limit: int = 20,
+    ) -> bytes:
+        tokens = tokenize(query)
+        with self._lock:
+            candidates = self._filtered(category, tags)
+            scores: Dict[int, float] = {}
+            if tokens:
+                for position, token in enumerate(tokens):
+                    matched = self._match(token)
+                    if position == 0:
+                        scores = {
+                            item_id: score
+                            for item_id, score in matched.items()
+                            if candidates is None or item_id in candidates
+                        }
+                    else:
+                        scores = {item_id: score + matched[item_id] for item_id, score in scores.items() if item_id in matched}
+                    if not scores:
+                        break
+                phrase = " ".join(tokens)
+                for item_id in scores:
+                    if self._docs[item_id].name.startswith(phrase):
+                        scores[item_id] += NAME_PREFIX_BONUS
+            else:
+                scores = dict.fromkeys(self._docs if candidates is None else candidates, 0.0)
+
+            if available is not None:
+                scores = {item_id: score for item_id, score in scores.items() if self._docs[item_id].is_available == available}
+            ranked = sorted(scores, key=lambda item_id: (-scores[item_id], self._docs[item_id].name, item_id))
+            return b"[" + b",".join(self._docs[item_id].body for item_id in ranked[:limit]) + b"]"
+
+    def _reset(self) -> None:
+        self._docs: Dict[int, SearchDocument] = {}
+        self._postings: Dict[str, Dict[int, float]] = {}
+        self._terms: List[str] = []
+        self._categories: Dict[str, Set[int]] = defaultdict(set)
+        self._tags: Dict[str, Set[int]] = defaultdict(set)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._reset()
+            self.version: Optional[str] = None
+
+
+menu_search: Partitioned[MenuSearchIndex] = Partitioned(MenuSearchIndex)
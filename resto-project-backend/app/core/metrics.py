@@ -0,0 +1,171 @@
+import logging
+import re
+import threading
+from bisect import bisect_left
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger("app.db.slow_query")
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+POOL_COUNTERS = {"checkouts", "timeouts", "wait_seconds_total"}
+
+_WHITESPACE = re.compile(r"\s+")
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"\((?:\s*(?:\?|%s|:\w+|\$\d+)\s*,)+\s*(?:\?|%s|:\w+|\$\d+)\s*\)")
+
+
+@dataclass
+class RequestStats:
+    queries: int = 0
+    db_seconds: float = 0.0
+    rows: int = 0
+
+
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def start_request() -> RequestStats:
+    stats = RequestStats()
+    _request_stats.set(stats)
+    return stats
+
+
+def current_request_stats() -> Optional[RequestStats]:
+    return _request_stats.get()
+
+
+def normalize_sql(statement: str) -> str:
+    statement = _STRING_LITERAL.sub("?", statement)
+    statement = _NUMBER_LITERAL.sub("?", statement)
+    statement = _PLACEHOLDER_LIST.sub("(...)", statement)
+    return _WHITESPACE.sub(" ", statement).strip()
+
+
+def record_query(statement: str, seconds: float, rows_written: int) -> None:
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_seconds += seconds
+        stats.rows += rows_written
+    metrics.record_query(seconds)
+    if settings.SLOW_QUERY_MS and seconds * 1000 >= settings.SLOW_QUERY_MS:
+        metrics.record_slow_query()
+        logger.warning("Slow query (%.1f ms): %s", seconds * 1000, normalize_sql(statement))
+
+
+def record_rows_loaded(count: int = 1) -> None:
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.rows += count
+
+
+class Histogram:
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.total += value
+
+    def lines(self, name: str, labels: str) -> List[str]:
+        prefix = f"{labels}," if labels else ""
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{prefix}le="{bound}"}} {cumulative}')
+        cumulative += self.counts[-1]
+        lines.append(f'{name}_bucket{{{prefix}le="+Inf"}} {cumulative}')
+        suffix = f"{{{labels}}}" if labels else ""
+        lines.append(f"{name}_sum{suffix} {self.total:.6f}")
+        lines.append(f"{name}_count{suffix} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.latency: Dict[Tuple[str, str], Histogram] = {}
+            self.db_latency: Dict[Tuple[str, str], Histogram] = {}
+            self.queries_per_request: Dict[Tuple[str, str], Histogram] = {}
+            self.responses: Dict[Tuple[str, str, int], int] = {}
+            self.queries_total = 0
+            self.query_seconds_total = 0.0
+            self.slow_queries_total = 0
+
+    def record_request(self, method: str, route: str, status: int, seconds: float, stats: RequestStats) -> None:
+        key = (method, route)
+        with self._lock:
+            if key not in self.latency:
+                self.latency[key] = Histogram(LATENCY_BUCKETS)
+                self.db_latency[key] = Histogram(LATENCY_BUCKETS)
+                self.queries_per_request[key] = Histogram(QUERY_BUCKETS)
+            self.latency[key].observe(seconds)
+            self.db_latency[key].observe(stats.db_seconds)
+            self.queries_per_request[key].observe(stats.queries)
+            self.responses[(method, route, status)] = self.responses.get((method, route, status), 0) + 1
+
+    def record_query(self, seconds: float) -> None:
+        with self._lock:
+            self.queries_total += 1
+            self.query_seconds_total += seconds
+
+    def record_slow_query(self) -> None:
+        with self._lock:
+            self.slow_queries_total += 1
+
+    def render(self, pool: Dict[str, float]) -> str:
+        lines = []
+        with self._lock:
+            lines += [
+                "# HELP http_request_duration_seconds Request wall time by route.",
+                "# TYPE http_request_duration_seconds histogram",
+            ]
+            for (method, route), histogram in sorted(self.latency.items()):
+                lines += histogram.lines("http_request_duration_seconds", _labels(method=method, route=route))
+            lines += [
+                "# HELP http_request_db_seconds Time spent executing SQL per request by route.",
+                "# TYPE http_request_db_seconds histogram",
+            ]
+            for (method, route), histogram in sorted(self.db_latency.items()):
+                lines += histogram.lines("http_request_db_seconds", _labels(method=method, route=route))
+            lines += [
+                "# HELP http_request_db_queries SQL statements per request by route.",
+                "# TYPE http_request_db_queries histogram",
+            ]
+            for (method, route), histogram in sorted(self.queries_per_request.items()):
+                lines += histogram.lines("http_request_db_queries", _labels(method=method, route=route))
+            lines += ["# HELP http_responses_total Responses by route and status.", "# TYPE http_responses_total counter"]
+            for (method, route, status), count in sorted(self.responses.items()):
+                lines.append(f"http_responses_total{{{_labels(method=method, route=route, status=status)}}} {count}")
+            lines += [
+                "# TYPE db_queries_total counter",
+                f"db_queries_total {self.queries_total}",
+                "# TYPE db_query_seconds_total counter",
+                f"db_query_seconds_total {self.query_seconds_total:.6f}",
+                "# TYPE db_slow_queries_total counter",
+                f"db_slow_queries_total {self.slow_queries_total}",
+            ]
+        for name, value in pool.items():
+            kind = "counter" if name in POOL_COUNTERS else "gauge"
+            lines += [f"# TYPE db_pool_{name} {kind}", f"db_pool_{name} {value}"]
+        return "\n".join(lines) + "\n"
+
+
+def _labels(**labels) -> str:
+    return ",".join(f'{key}="{str(value).replace(chr(34), chr(39))}"' for key, value in labels.items())
+
+
+metrics = MetricsRegistry()
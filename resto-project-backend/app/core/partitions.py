@@ -0,0 +1,24 @@
+import threading
+from typing import Callable, Dict, Generic, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class Partitioned(Generic[T]):
+    def __init__(self, factory: Callable[[], T]):
+        self._factory = factory
+        self._partitions: Dict[Hashable, T] = {}
+        self._lock = threading.Lock()
+
+    def __getitem__(self, key: Hashable) -> T:
+        partition = self._partitions.get(key)
+        if partition is None:
+            with self._lock:
+                partition = self._partitions.get(key)
+                if partition is None:
+                    partition = self._partitions[key] = self._factory()
+        return partition
+
+    def clear(self) -> None:
+        with self._lock:
+            self._partitions.clear()
@@ -0,0 +1,111 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import NamedTuple, Tuple
+
+from app.core.config import settings
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+
+class Rule(NamedTuple):
+    limit: int
+    period: int
+
+    @property
+    def rate(self) -> float:
+        return self.limit / self.period
+
+
+class Decision(NamedTuple):
+    allowed: bool
+    limit: int
+    remaining: int
+    reset: int
+
+
+def parse_rule(value: str) -> Rule:
+    count, _, period = value.partition("/")
+    return Rule(int(count), PERIODS[period.strip().rstrip("s")])
+
+
+def _decide(rule: Rule, tokens: float, allowed: bool) -> Decision:
+    if allowed:
+        reset = math.ceil((rule.limit - tokens) / rule.rate)
+    else:
+        reset = math.ceil((1 - tokens) / rule.rate)
+    return Decision(allowed, rule.limit, int(tokens), max(reset, 0))
+
+
+class MemoryRateLimitStore:
+    def __init__(self, max_keys: int = 100000):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def hit(self, key: str, rule: Rule) -> Decision:
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (float(rule.limit), now))
+            tokens = min(float(rule.limit), tokens + (now - updated) * rule.rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return _decide(rule, tokens, allowed)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+
+
+_REDIS_TOKEN_BUCKET = """
+local limit = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(bucket[1]) or limit
+local updated = tonumber(bucket[2]) or now
+tokens = math.min(limit, tokens + math.max(0, now - updated) * rate)
+local allowed = 0
+if tokens >= 1 then
+  tokens = tokens - 1
+  allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(limit / rate) + 1)
+return {allowed, tostring(tokens)}
+"""
+
+
+class RedisRateLimitStore:
+    def __init__(self, url: str, prefix: str = "resto:ratelimit:"):
+        try:
+            import redis
+        except ImportError as exc:
+            raise RuntimeError("RATE_LIMIT_BACKEND=redis requires the 'redis' package") from exc
+        self._client = redis.Redis.from_url(url)
+        self._script = self._client.register_script(_REDIS_TOKEN_BUCKET)
+        self.prefix = prefix
+
+    def hit(self, key: str, rule: Rule) -> Decision:
+        allowed, tokens = self._script(keys=[self.prefix + key], args=[rule.limit, rule.rate, time.time()])
+        return _decide(rule, float(tokens), bool(allowed))
+
+    def clear(self) -> None:
+        keys = list(self._client.scan_iter(match=f"{self.prefix}*"))
+        if keys:
+            self._client.delete(*keys)
+
+
+def build_rate_limit_store():
+    if settings.RATE_LIMIT_BACKEND == "redis":
+        return RedisRateLimitStore(settings.RATE_LIMIT_URL or settings.CACHE_URL)
+    return MemoryRateLimitStore(max_keys=settings.RATE_LIMIT_MAX_KEYS)
+
+
+rate_limit_store = build_rate_limit_store()
@@ -1,25 +1,114 @@
+import asyncio
+import threading
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Any, Optional
+from functools import lru_cache
+from typing import Any, Optional, Tuple
 
-from jose import jwt
-from passlib.context import CryptContext
+from fastapi import HTTPException, status
 
 from app.core.config import settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+@lru_cache(maxsize=None)
+def _password_context():
+    # passlib and bcrypt load on the first hash, not at import, to keep worker boot fast.
+    from passlib.context import CryptContext
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS)
 
 
+def _jwt():
+    from jose import jwt
+
+    return jwt
+
+
+def _hash(password: str) -> str:
+    return _password_context().hash(password)
+
+
+def _verify_and_update(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    return _password_context().verify_and_update(plain_password, hashed_password)
+
+
+class PasswordHasher:
+    def __init__(self, kind: str, workers: int, max_pending: int):
+        self.kind = kind
+        self.workers = workers
+        self._executor: Optional[Executor] = None
+        self._executor_lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_pending)
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    if self.kind == "process":
+                        self._executor = ProcessPoolExecutor(max_workers=self.workers)
+                    else:
+                        self._executor = ThreadPoolExecutor(
+                            max_workers=self.workers, thread_name_prefix="password-hash"
+                        )
+        return self._executor
+
+    def submit(self, fn, *args) -> Future:
+        if not self._slots.acquire(blocking=False):
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server busy, please retry",
+                headers={"Retry-After": str(settings.PASSWORD_HASH_RETRY_AFTER)},
+            )
+        try:
+            future = self.executor.submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+
+password_hasher = PasswordHasher(
+    settings.PASSWORD_HASH_EXECUTOR,
+    settings.PASSWORD_HASH_WORKERS,
+    settings.PASSWORD_HASH_MAX_PENDING,
+)
+
+
+# Sync callers (scripts, seeders) hash inline; only request handlers go through the bounded executor.
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    return _hash(password)
+
+
+async def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    return await asyncio.wrap_future(password_hasher.submit(_verify_and_update, plain_password, hashed_password))
 
 
-def create_access_token(subject: str, role: str, expires_delta: Optional[int] = None) -> str:
+async def get_password_hash_async(password: str) -> str:
+    return await asyncio.wrap_future(password_hasher.submit(_hash, password))
+
+
+def create_access_token(
+    subject: str,
+    role: str,
+    expires_delta: Optional[int] = None,
+    version: int = 0,
+    location_id: Optional[int] = None,
+) -> str:
     if expires_delta is None:
         expires_delta = settings.ACCESS_TOKEN_EXPIRE_MINUTES
     expire = datetime.utcnow() + timedelta(minutes=expires_delta)
-    to_encode: dict[str, Any] = {"exp": expire, "sub": subject, "role": role}
-    return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+    to_encode: dict[str, Any] = {"exp": expire, "sub": subject, "role": role, "ver": version}
+    if location_id is not None:
+        to_encode["loc"] = location_id
+    return _jwt().encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+
+
+def decode_access_token(token: str) -> Optional[dict]:
+    from jose import JWTError
+
+    try:
+        return _jwt().decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    except JWTError:
+        return None
@@ -0,0 +1,145 @@
+import os
+import stat
+import threading
+import time
+from collections import OrderedDict
+from email.utils import formatdate
+from mimetypes import guess_type
+from typing import Dict, NamedTuple, Optional, Tuple
+
+import anyio
+from starlette.datastructures import Headers
+from starlette.exceptions import HTTPException
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Scope
+
+from app.core.config import settings
+
+PRECOMPRESSED = (("br", ".br"), ("gzip", ".gz"))
+
+
+class CachedFile(NamedTuple):
+    full_path: str
+    stat_result: os.stat_result
+    headers: Dict[str, str]
+    media_type: str
+    encodings: Dict[str, Tuple[str, os.stat_result]]
+    checked_at: float
+
+
+class _PrecomputedFileResponse(FileResponse):
+    def set_stat_headers(self, stat_result: os.stat_result) -> None:
+        if "etag" not in self.headers:
+            super().set_stat_headers(stat_result)
+
+
+def _stat_headers(stat_result: os.stat_result) -> Dict[str, str]:
+    return {
+        "content-length": str(stat_result.st_size),
+        "last-modified": formatdate(stat_result.st_mtime, usegmt=True),
+        "etag": f'"{int(stat_result.st_mtime_ns):x}-{stat_result.st_size:x}"',
+    }
+
+
+def accepted_encodings(header: str) -> set:
+    accepted = set()
+    for token in header.split(","):
+        name, _, params = token.partition(";")
+        if params.replace(" ", "").lower() in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        accepted.add(name.strip().lower())
+    return accepted
+
+
+class UploadsStaticFiles(StaticFiles):
+    def __init__(self, *args, max_age: int = 31536000, cache_size: int = 4096, stat_ttl: float = 5, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cache_control = f"public, max-age={max_age}, immutable"
+        self.cache_size = cache_size
+        self.stat_ttl = stat_ttl
+        self._cache: "OrderedDict[str, CachedFile]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _load(self, path: str) -> Optional[CachedFile]:
+        full_path, stat_result = self.lookup_path(path)
+        if stat_result is None or not stat.S_ISREG(stat_result.st_mode):
+            return None
+        encodings = {}
+        for encoding, suffix in PRECOMPRESSED:
+            try:
+                compressed_stat = os.stat(full_path + suffix)
+            except OSError:
+                continue
+            if stat.S_ISREG(compressed_stat.st_mode):
+                encodings[encoding] = (full_path + suffix, compressed_stat)
+        headers = {"cache-control": self.cache_control}
+        if encodings:
+            headers["vary"] = "Accept-Encoding"
+        media_type = guess_type(full_path)[0] or "application/octet-stream"
+        return CachedFile(full_path, stat_result, headers, media_type, encodings, time.monotonic())
+
+    async def _lookup(self, path: str) -> Optional[CachedFile]:
+        with self._lock:
+            cached = self._cache.get(path)
+            # Entries are re-stated after stat_ttl so replaced, deleted or newly compressed files are noticed.
+            if cached is not None and time.monotonic() - cached.checked_at < self.stat_ttl:
+                self._cache.move_to_end(path)
+                return cached
+        try:
+            cached = await anyio.to_thread.run_sync(self._load, path)
+        except PermissionError:
+            self._forget(path)
+            raise HTTPException(status_code=401)
+        except (OSError, ValueError):
+            self._forget(path)
+            raise HTTPException(status_code=404)
+        if cached is None:
+            self._forget(path)
+            return None
+        with self._lock:
+            self._cache[path] = cached
+            self._cache.move_to_end(path)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return cached
+
+    def _forget(self, path: str) -> None:
+        with self._lock:
+            self._cache.pop(path, None)
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        if scope["method"] not in ("GET", "HEAD"):
+            raise HTTPException(status_code=405, headers={"Allow": "GET, HEAD"})
+        cached = await self._lookup(path)
+        if cached is None:
+            raise HTTPException(status_code=404)
+
+        request_headers = Headers(scope=scope)
+        full_path, stat_result = cached.full_path, cached.stat_result
+        headers = dict(cached.headers)
+        if cached.encodings and "range" not in request_headers:
+            accepted = accepted_encodings(request_headers.get("accept-encoding", ""))
+            for encoding, _ in PRECOMPRESSED:
+                if encoding in accepted and encoding in cached.encodings:
+                    full_path, stat_result = cached.encodings[encoding]
+                    headers["content-encoding"] = encoding
+                    break
+        headers.update(_stat_headers(stat_result))
+
+        response = _PrecomputedFileResponse(
+            full_path, stat_result=stat_result, headers=headers, media_type=cached.media_type
+        )
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
+
+
+def uploads_app(directory: str = "uploads") -> UploadsStaticFiles:
+    return UploadsStaticFiles(
+        directory=directory,
+        check_dir=False,
+        max_age=settings.UPLOADS_MAX_AGE,
+        cache_size=settings.UPLOADS_STAT_CACHE_SIZE,
+        stat_ttl=settings.UPLOADS_STAT_TTL,
+    )
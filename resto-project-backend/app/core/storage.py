@@ -0,0 +1,70 @@
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+from typing import BinaryIO, Optional
+
+from fastapi import HTTPException, status
+
+from app.core.config import settings
+
+IMAGE_SIGNATURES = (
+    (b"\xff\xd8\xff", ".jpg"),
+    (b"\x89PNG\r\n\x1a\n", ".png"),
+    (b"GIF87a", ".gif"),
+    (b"GIF89a", ".gif"),
+)
+
+
+def sniff_image_extension(head: bytes) -> Optional[str]:
+    for signature, extension in IMAGE_SIGNATURES:
+        if head.startswith(signature):
+            return extension
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return ".webp"
+    if head[4:8] == b"ftyp" and head[8:12] in (b"avif", b"avis"):
+        return ".avif"
+    return None
+
+
+def store_image(source: BinaryIO, directory: Path) -> str:
+    directory.mkdir(parents=True, exist_ok=True)
+    digest = hashlib.sha256()
+    size = 0
+    extension = None
+    fd, temp_name = tempfile.mkstemp(dir=directory, prefix=".upload-")
+    try:
+        with os.fdopen(fd, "wb") as buffer:
+            while True:
+                chunk = source.read(settings.UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                if extension is None:
+                    extension = sniff_image_extension(chunk)
+                    if extension is None:
+                        raise HTTPException(
+                            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Invalid image type"
+                        )
+                size += len(chunk)
+                if size > settings.MAX_UPLOAD_BYTES:
+                    raise HTTPException(
+                        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                        detail=f"Image exceeds {settings.MAX_UPLOAD_BYTES} bytes",
+                    )
+                digest.update(chunk)
+                buffer.write(chunk)
+        if extension is None:
+            raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Empty upload")
+
+        file_name = f"{digest.hexdigest()}{extension}"
+        target = directory / file_name
+        if target.exists():
+            os.unlink(temp_name)
+        else:
+            os.chmod(temp_name, 0o644)
+            os.replace(temp_name, target)
+        return file_name
+    except BaseException:
+        if os.path.exists(temp_name):
+            os.unlink(temp_name)
+        raise
@@ -0,0 +1,13 @@
+from typing import Any, Dict, Optional
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+
+def update_returning(db: Session, model, pk: Any, values: Dict[str, Any], *conditions) -> Optional[Any]:
+    statement = update(model).where(model.id == pk, *conditions).values(**values)
+    if db.get_bind().dialect.update_returning:
+        return db.scalars(statement.returning(model), execution_options={"populate_existing": True}).first()
+    if db.execute(statement).rowcount == 0:
+        return None
+    return db.scalars(select(model).where(model.id == pk), execution_options={"populate_existing": True}).first()
@@ -0,0 +1,77 @@
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import delete, exc, select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.idempotency_key import IdempotencyKey
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _aware(value: datetime) -> datetime:
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def claim_idempotency_key(db: Session, owner: str, key: str, request_hash: str) -> Optional[IdempotencyKey]:
+    now = _now()
+    record = db.scalars(
+        select(IdempotencyKey).where(IdempotencyKey.owner == owner, IdempotencyKey.key == key)
+    ).first()
+    if record is not None:
+        reclaimable = _aware(record.expires_at) <= now or (
+            record.status_code is None and _aware(record.locked_until) <= now
+        )
+        if not reclaimable:
+            return record
+        db.delete(record)
+        db.flush()
+    db.add(
+        IdempotencyKey(
+            owner=owner,
+            key=key,
+            request_hash=request_hash,
+            locked_until=now + timedelta(seconds=settings.IDEMPOTENCY_LOCK_SECONDS),
+            expires_at=now + timedelta(seconds=settings.IDEMPOTENCY_TTL_SECONDS),
+        )
+    )
+    try:
+        db.commit()
+    except exc.IntegrityError:
+        db.rollback()
+        return db.scalars(
+            select(IdempotencyKey).where(IdempotencyKey.owner == owner, IdempotencyKey.key == key)
+        ).first()
+    return None
+
+
+def complete_idempotency_key(db: Session, owner: str, key: str, status_code: int, body: bytes) -> None:
+    db.execute(
+        update(IdempotencyKey)
+        .where(IdempotencyKey.owner == owner, IdempotencyKey.key == key)
+        .values(status_code=status_code, response_body=body),
+        execution_options={"synchronize_session": False},
+    )
+
+
+def release_idempotency_key(db: Session, owner: str, key: str) -> None:
+    db.rollback()
+    db.execute(
+        delete(IdempotencyKey).where(
+            IdempotencyKey.owner == owner, IdempotencyKey.key == key, IdempotencyKey.status_code.is_(None)
+        ),
+        execution_options={"synchronize_session": False},
+    )
+    db.commit()
+
+
+def purge_expired_idempotency_keys(db: Session) -> int:
+    purged = db.execute(
+        delete(IdempotencyKey).where(IdempotencyKey.expires_at <= _now()),
+        execution_options={"synchronize_session": False},
+    ).rowcount
+    db.commit()
+    return purged
@@ -0,0 +1,52 @@
+import threading
+from typing import List, Optional, Set
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.cache import MemoryCache
+from app.core.config import settings
+from app.models.location import Location
+from app.schemas.location import LocationCreate
+
+_known_ids: Set[int] = set()
+_known_lock = threading.Lock()
+# Unknown ids are remembered briefly, so repeating a bad location_id does not cost a query per request.
+_missing_ids = MemoryCache(max_entries=1024)
+
+
+def list_locations(db: Session) -> List[Location]:
+    return list(db.scalars(select(Location).order_by(Location.id)))
+
+
+def get_location_by_slug(db: Session, slug: str) -> Optional[Location]:
+    return db.scalars(select(Location).where(Location.slug == slug)).first()
+
+
+def create_location(db: Session, location_in: LocationCreate) -> Location:
+    location = Location(**location_in.model_dump())
+    db.add(location)
+    db.commit()
+    with _known_lock:
+        _known_ids.add(location.id)
+    _missing_ids.delete(str(location.id))
+    return location
+
+
+def location_exists(db: Session, location_id: int) -> bool:
+    if location_id in _known_ids:
+        return True
+    if _missing_ids.get(str(location_id)) is not None:
+        return False
+    if db.scalar(select(Location.id).where(Location.id == location_id)) is None:
+        _missing_ids.set(str(location_id), b"1", ttl=settings.LOCATION_MISS_TTL)
+        return False
+    with _known_lock:
+        _known_ids.add(location_id)
+    return True
+
+
+def forget_locations() -> None:
+    with _known_lock:
+        _known_ids.clear()
+    _missing_ids.clear()
@@ -1,36 +1,191 @@
-from typing import List, Optional
+from decimal import Decimal
+from typing import Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
 
+from pydantic import TypeAdapter
+from sqlalchemy import delete, insert, select, update
 from sqlalchemy.orm import Session
 
+from app.core.cache import bump_version, cache, get_version
+from app.core.config import settings
+from app.core.images import srcset_for
+from app.core.menu_search import menu_search
+from app.crud.base import update_returning
 from app.models.menu_item import MenuItem
-from app.schemas.menu_item import MenuItemCreate, MenuItemUpdate
+from app.schemas.menu_item import MenuItemCreate, MenuItemRead, MenuItemUpdate
 
+MENU_CACHE_NAMESPACE = "menu"
+MENU_EXPORT_FIELDS = list(MenuItemCreate.model_fields)
+BULK_LOOKUP_CHUNK = 500
 
-def list_menu_items(db: Session) -> List[MenuItem]:
-    return db.query(MenuItem).order_by(MenuItem.created_at.desc()).all()
+_menu_list_adapter = TypeAdapter(List[MenuItemRead])
 
 
-def get_menu_item(db: Session, item_id: int) -> Optional[MenuItem]:
-    return db.query(MenuItem).filter(MenuItem.id == item_id).first()
+class MenuPrice(NamedTuple):
+    name: str
+    price: Decimal
+    is_available: bool
 
 
-def create_menu_item(db: Session, item_in: MenuItemCreate) -> MenuItem:
-    db_item = MenuItem(**item_in.dict())
+_price_snapshots: Dict[int, Tuple[str, Dict[int, MenuPrice]]] = {}
+
+
+def menu_namespace(location_id: int) -> str:
+    return f"{MENU_CACHE_NAMESPACE}:{location_id}"
+
+
+def list_menu_items(db: Session, location_id: int) -> List[MenuItem]:
+    return (
+        db.query(MenuItem)
+        .filter(MenuItem.location_id == location_id)
+        .order_by(MenuItem.created_at.desc())
+        .all()
+    )
+
+
+def list_menu_items_json(db: Session, location_id: int) -> bytes:
+    namespace = menu_namespace(location_id)
+    # Replica bodies may predate the current version, so they get their own short-lived key.
+    if db.info.get("replica"):
+        key, ttl = f"{namespace}:list:replica", min(settings.MENU_CACHE_TTL, settings.READ_REPLICA_MAX_LAG_SECONDS)
+    else:
+        key, ttl = f"{namespace}:list:{get_version(namespace)}", settings.MENU_CACHE_TTL
+    body = cache.get(key)
+    if body is None:
+        items = _menu_list_adapter.validate_python(list_menu_items(db, location_id), from_attributes=True)
+        body = _menu_list_adapter.dump_json(items)
+        cache.set(key, body, ttl=ttl)
+    return body
+
+
+def search_menu_items_json(
+    db: Session,
+    location_id: int,
+    query: Optional[str] = None,
+    category: Optional[str] = None,
+    tags: Sequence[str] = (),
+    available: Optional[bool] = None,
+    limit: int = 20,
+) -> bytes:
+    version = get_version(menu_namespace(location_id))
+    index = menu_search[location_id]
+    if index.version != version:
+        index.load(list_menu_items(db, location_id), version)
+    return index.search(query, category=category, tags=tags, available=available, limit=limit)
+
+
+def _menu_changed(location_id: int, upserted: Sequence[MenuItem] = (), removed: Sequence[int] = ()) -> None:
+    namespace = menu_namespace(location_id)
+    previous = get_version(namespace)
+    menu_search[location_id].apply(previous, bump_version(namespace), upserted, removed)
+
+
+def menu_price_snapshot(db: Session, location_id: int) -> Dict[int, MenuPrice]:
+    version = get_version(menu_namespace(location_id))
+    snapshot = _price_snapshots.get(location_id)
+    if snapshot is None or snapshot[0] != version:
+        rows = db.execute(
+            select(MenuItem.id, MenuItem.name, MenuItem.price, MenuItem.is_available).where(
+                MenuItem.location_id == location_id
+            )
+        )
+        snapshot = _price_snapshots[location_id] = (
+            version,
+            {row.id: MenuPrice(row.name, row.price, row.is_available) for row in rows},
+        )
+    return snapshot[1]
+
+
+def get_menu_item(db: Session, location_id: int, item_id: int) -> Optional[MenuItem]:
+    return db.query(MenuItem).filter(MenuItem.id == item_id, MenuItem.location_id == location_id).first()
+
+
+def create_menu_item(db: Session, location_id: int, item_in: MenuItemCreate) -> MenuItem:
+    db_item = MenuItem(**item_in.dict(), location_id=location_id)
+    db_item.image_srcset = srcset_for(db_item.image_url)
     db.add(db_item)
     db.commit()
-    db.refresh(db_item)
+    _menu_changed(location_id, upserted=[db_item])
     return db_item
 
 
-def update_menu_item(db: Session, item: MenuItem, item_in: MenuItemUpdate) -> MenuItem:
+def update_menu_item(db: Session, location_id: int, item_id: int, item_in: MenuItemUpdate) -> Optional[MenuItem]:
     data = item_in.dict(exclude_unset=True)
-    for key, value in data.items():
-        setattr(item, key, value)
+    if not data:
+        return get_menu_item(db, location_id, item_id)
+    if "image_url" in data:
+        data["image_srcset"] = srcset_for(data["image_url"])
+    item = update_returning(db, MenuItem, item_id, data, MenuItem.location_id == location_id)
     db.commit()
-    db.refresh(item)
+    if item is not None:
+        _menu_changed(location_id, upserted=[item])
     return item
 
 
-def delete_menu_item(db: Session, item: MenuItem) -> None:
-    db.delete(item)
+def delete_menu_item(db: Session, location_id: int, item_id: int) -> bool:
+    deleted = db.execute(
+        delete(MenuItem).where(MenuItem.id == item_id, MenuItem.location_id == location_id)
+    ).rowcount
+    db.commit()
+    if deleted:
+        _menu_changed(location_id, removed=[item_id])
+    return bool(deleted)
+
+
+def set_image_srcset(db: Session, image_url: str, srcset: Dict[str, str]) -> int:
+    location_ids = list(db.scalars(select(MenuItem.location_id).where(MenuItem.image_url == image_url).distinct()))
+    updated = (
+        db.query(MenuItem)
+        .filter(MenuItem.image_url == image_url)
+        .update({MenuItem.image_srcset: srcset}, synchronize_session=False)
+    )
     db.commit()
+    if updated:
+        for location_id in location_ids:
+            bump_version(menu_namespace(location_id))
+    return updated
+
+
+def bulk_upsert_menu_items(db: Session, location_id: int, items: List[MenuItemCreate]) -> Dict[str, int]:
+    rows: Dict[str, dict] = {}
+    for item_in in items:
+        row = item_in.model_dump()
+        row["image_srcset"] = srcset_for(row["image_url"])
+        row["location_id"] = location_id
+        rows[row["name"]] = row
+
+    names = list(rows)
+    existing: Dict[str, int] = {}
+    for start in range(0, len(names), BULK_LOOKUP_CHUNK):
+        chunk = names[start:start + BULK_LOOKUP_CHUNK]
+        existing.update(
+            db.execute(
+                select(MenuItem.name, MenuItem.id).where(MenuItem.location_id == location_id, MenuItem.name.in_(chunk))
+            ).all()
+        )
+
+    inserts = [row for name, row in rows.items() if name not in existing]
+    updates = [{**row, "id": existing[name]} for name, row in rows.items() if name in existing]
+    if inserts:
+        db.execute(insert(MenuItem.__table__), inserts)
+    if updates:
+        db.execute(update(MenuItem), updates)
+    db.commit()
+    if rows:
+        bump_version(menu_namespace(location_id))
+    return {"created": len(inserts), "updated": len(updates)}
+
+
+def export_row(item: MenuItem) -> dict:
+    row = {name: getattr(item, name) for name in MENU_EXPORT_FIELDS}
+    row["price"] = float(row["price"])
+    row["tags"] = row["tags"] or []
+    return row
+
+
+def menu_export_query(location_id: int):
+    return select(MenuItem).where(MenuItem.location_id == location_id).order_by(MenuItem.id)
+
+
+def iter_menu_items(db: Session, location_id: int, batch_size: int) -> Iterator[List[MenuItem]]:
+    result = db.execute(menu_export_query(location_id).execution_options(yield_per=batch_size))
+    yield from result.scalars().partitions()
@@ -0,0 +1,112 @@
+from typing import Callable, Dict, Optional, Sequence
+
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session, selectinload
+
+from app.core.cache import bump_version, get_version
+from app.core.kitchen import OPEN_ORDER_STATUSES, Ticket, kitchen_queue
+from app.crud.base import update_returning
+from app.crud.menu_item import MenuPrice
+from app.models.order import Order, OrderLine
+from app.schemas.order import OrderCreate, OrderLineRead, OrderRead
+
+ORDERS_CACHE_NAMESPACE = "orders"
+
+
+def orders_namespace(location_id: int) -> str:
+    return f"{ORDERS_CACHE_NAMESPACE}:{location_id}"
+
+
+def _order_read(order: Order, lines: Sequence) -> OrderRead:
+    return OrderRead(
+        id=order.id,
+        location_id=order.location_id,
+        reservation_id=order.reservation_id,
+        table_label=order.table_label,
+        notes=order.notes,
+        status=order.status,
+        total=order.total,
+        created_at=order.created_at,
+        lines=[OrderLineRead.model_validate(line) for line in lines],
+    )
+
+
+def _ticket(order: OrderRead) -> Ticket:
+    return Ticket(order.id, order.status, order.model_dump_json().encode())
+
+
+def _orders_changed(location_id: int, orders: Sequence[OrderRead]) -> None:
+    namespace = orders_namespace(location_id)
+    previous = get_version(namespace)
+    kitchen_queue[location_id].apply(previous, bump_version(namespace), [_ticket(order) for order in orders])
+
+
+def create_order(
+    db: Session,
+    location_id: int,
+    order_in: OrderCreate,
+    prices: Dict[int, MenuPrice],
+    before_commit: Optional[Callable[[Session, OrderRead], None]] = None,
+) -> OrderRead:
+    lines = [
+        {
+            "menu_item_id": line.menu_item_id,
+            "name": prices[line.menu_item_id].name,
+            "quantity": line.quantity,
+            "unit_price": prices[line.menu_item_id].price,
+            "notes": line.notes,
+        }
+        for line in order_in.lines
+    ]
+    order = Order(
+        location_id=location_id,
+        reservation_id=order_in.reservation_id,
+        table_label=order_in.table_label,
+        notes=order_in.notes,
+        total=sum(line["unit_price"] * line["quantity"] for line in lines),
+    )
+    db.add(order)
+    db.flush()
+    db.execute(insert(OrderLine.__table__), [{**line, "order_id": order.id} for line in lines])
+    created = _order_read(order, lines)
+    if before_commit is not None:
+        before_commit(db, created)
+    db.commit()
+    _orders_changed(location_id, [created])
+    return created
+
+
+def get_order(db: Session, location_id: int, order_id: int) -> Optional[Order]:
+    return db.scalars(select(Order).where(Order.id == order_id, Order.location_id == location_id)).first()
+
+
+def update_order_status(db: Session, location_id: int, order_id: int, status: str) -> Optional[OrderRead]:
+    order = update_returning(
+        db,
+        Order,
+        order_id,
+        {"status": status},
+        Order.location_id == location_id,
+        Order.status.in_(OPEN_ORDER_STATUSES),
+    )
+    if order is None:
+        db.rollback()
+        return None
+    updated = _order_read(order, order.lines)
+    db.commit()
+    _orders_changed(location_id, [updated])
+    return updated
+
+
+def kitchen_tickets_json(db: Session, location_id: int, status: Optional[str] = None) -> bytes:
+    version = get_version(orders_namespace(location_id))
+    queue = kitchen_queue[location_id]
+    if queue.version != version:
+        orders = db.scalars(
+            select(Order)
+            .where(Order.location_id == location_id, Order.status.in_(OPEN_ORDER_STATUSES))
+            .order_by(Order.created_at, Order.id)
+            .options(selectinload(Order.lines))
+        )
+        queue.load([_ticket(_order_read(order, order.lines)) for order in orders], version)
+    return queue.snapshot(status)
@@ -0,0 +1,119 @@
+from collections import defaultdict
+from datetime import date, datetime
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.orm import Session
+
+from app.models.report import ReservationRollup
+from app.models.reservation import Reservation
+
+REBUILD_BATCH_SIZE = 5000
+
+_rollups = ReservationRollup.__table__
+
+
+def _bucket(reserved_for: datetime) -> Tuple[date, int]:
+    wall_clock = reserved_for.replace(tzinfo=None)
+    return wall_clock.date(), wall_clock.hour
+
+
+def _upsert(db: Session):
+    dialect = db.get_bind().dialect.name
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    elif dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    else:
+        return None
+    statement = dialect_insert(_rollups)
+    return statement.on_conflict_do_update(
+        index_elements=[_rollups.c.location_id, _rollups.c.day, _rollups.c.hour, _rollups.c.status],
+        set_={
+            "reservations": _rollups.c.reservations + statement.excluded.reservations,
+            "covers": _rollups.c.covers + statement.excluded.covers,
+        },
+    )
+
+
+def record_reservation_change(
+    db: Session,
+    location_id: int,
+    reserved_for: datetime,
+    party_size: int,
+    status: str,
+    previous_status: Optional[str] = None,
+) -> None:
+    day, hour = _bucket(reserved_for)
+    bucket = {"location_id": location_id, "day": day, "hour": hour}
+    rows = [{**bucket, "status": status, "reservations": 1, "covers": party_size}]
+    if previous_status is not None:
+        rows.append({**bucket, "status": previous_status, "reservations": -1, "covers": -party_size})
+    statement = _upsert(db)
+    if statement is not None:
+        db.execute(statement, rows)
+        return
+    for row in rows:
+        bumped = db.execute(
+            update(ReservationRollup)
+            .where(
+                ReservationRollup.location_id == row["location_id"],
+                ReservationRollup.day == row["day"],
+                ReservationRollup.hour == row["hour"],
+                ReservationRollup.status == row["status"],
+            )
+            .values(
+                reservations=ReservationRollup.reservations + row["reservations"],
+                covers=ReservationRollup.covers + row["covers"],
+            )
+        )
+        if bumped.rowcount == 0:
+            db.execute(insert(_rollups), row)
+
+
+def rebuild_reservation_rollups(db: Session) -> int:
+    totals: Dict[Tuple[int, date, int, str], List[int]] = defaultdict(lambda: [0, 0])
+    result = db.execute(
+        select(
+            Reservation.location_id, Reservation.reserved_for, Reservation.status, Reservation.party_size
+        ).execution_options(yield_per=REBUILD_BATCH_SIZE)
+    )
+    for location_id, reserved_for, status, party_size in result:
+        entry = totals[(location_id, *_bucket(reserved_for), status)]
+        entry[0] += 1
+        entry[1] += party_size
+    db.execute(delete(ReservationRollup))
+    rows = [
+        {
+            "location_id": location_id,
+            "day": day,
+            "hour": hour,
+            "status": status,
+            "reservations": count,
+            "covers": covers,
+        }
+        for (location_id, day, hour, status), (count, covers) in totals.items()
+    ]
+    for start in range(0, len(rows), REBUILD_BATCH_SIZE):
+        db.execute(insert(_rollups), rows[start:start + REBUILD_BATCH_SIZE])
+    db.commit()
+    return len(rows)
+
+
+def rollup_totals(db: Session, location_id: int, date_from: date, date_to: date, group_by: str) -> List[Tuple]:
+    key = getattr(ReservationRollup, group_by)
+    return db.execute(
+        select(
+            key,
+            ReservationRollup.status,
+            func.sum(ReservationRollup.reservations),
+            func.sum(ReservationRollup.covers),
+        )
+        .where(
+            ReservationRollup.location_id == location_id,
+            ReservationRollup.day >= date_from,
+            ReservationRollup.day <= date_to,
+        )
+        .group_by(key, ReservationRollup.status)
+        .order_by(key)
+    ).all()
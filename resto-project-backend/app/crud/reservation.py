@@ -1,42 +1,159 @@
-from typing import List, Optional
+import json
+from datetime import datetime
+from typing import Callable, List, Optional, Sequence, Tuple
 
+from sqlalchemy import and_, or_
 from sqlalchemy.orm import Session
 
+from app.core.availability import availability
+from app.core.cache import bump_version
+from app.core.events import event_broker
+from app.crud.base import update_returning
+from app.crud.report import record_reservation_change
 from app.models.reservation import Reservation
-from app.schemas.reservation import ReservationCreate, ReservationUpdate
+from app.schemas.reservation import ReservationCreate, ReservationFilter, ReservationRead
+
+RESERVATION_CACHE_NAMESPACE = "reservations"
+RESERVATION_EVENTS_CHANNEL = "reservations"
+
+
+def reservation_namespace(location_id: int) -> str:
+    return f"{RESERVATION_CACHE_NAMESPACE}:{location_id}"
+
+
+def reservation_channel(location_id: int) -> str:
+    return f"{RESERVATION_EVENTS_CHANNEL}:{location_id}"
+
+
+def publish_reservation_event(event_type: str, reservation: Reservation) -> str:
+    payload = {"type": event_type, "reservation": ReservationRead.model_validate(reservation).model_dump(mode="json")}
+    return event_broker.publish(
+        reservation_channel(reservation.location_id), json.dumps(payload, separators=(",", ":")).encode()
+    )
+
+
+def _reservations_changed(location_id: int) -> None:
+    # Customer views (/me) span the whole chain, so they keep the unscoped namespace.
+    bump_version(reservation_namespace(location_id))
+    bump_version(RESERVATION_CACHE_NAMESPACE)
 
 
 def create_reservation(
-    db: Session, reservation_in: ReservationCreate, user_id: Optional[int]
+    db: Session,
+    location_id: int,
+    reservation_in: ReservationCreate,
+    user_id: Optional[int],
+    before_commit: Optional[Callable[[Session, Reservation], None]] = None,
+    check_capacity: bool = True,
 ) -> Reservation:
-    db_item = Reservation(**reservation_in.dict(), user_id=user_id)
+    if check_capacity:
+        availability.claim(db, location_id, reservation_in.reserved_for, reservation_in.party_size)
+    db_item = Reservation(**reservation_in.dict(), location_id=location_id, user_id=user_id)
     db.add(db_item)
+    db.flush()
+    record_reservation_change(db, location_id, db_item.reserved_for, db_item.party_size, db_item.status)
+    if before_commit is not None:
+        before_commit(db, db_item)
     db.commit()
-    db.refresh(db_item)
+    availability.add(db_item)
+    _reservations_changed(location_id)
+    publish_reservation_event("reservation.created", db_item)
     return db_item
 
 
-def list_reservations(db: Session) -> List[Reservation]:
-    return db.query(Reservation).order_by(Reservation.created_at.desc()).all()
+def list_reservations(
+    db: Session,
+    location_id: Optional[int] = None,
+    filters: Optional[ReservationFilter] = None,
+    user_id: Optional[int] = None,
+    after: Optional[Tuple[datetime, int]] = None,
+    limit: Optional[int] = None,
+    fields: Optional[Sequence[str]] = None,
+) -> List[Reservation]:
+    if fields:
+        query = db.query(*[getattr(Reservation, name) for name in fields])
+    else:
+        query = db.query(Reservation)
 
+    if location_id is not None:
+        query = query.filter(Reservation.location_id == location_id)
+    if user_id is not None:
+        query = query.filter(Reservation.user_id == user_id)
+    if filters is not None:
+        if filters.status is not None:
+            query = query.filter(Reservation.status == filters.status)
+        if filters.reserved_from is not None:
+            query = query.filter(Reservation.reserved_for >= filters.reserved_from)
+        if filters.reserved_to is not None:
+            query = query.filter(Reservation.reserved_for <= filters.reserved_to)
+        if filters.min_party_size is not None:
+            query = query.filter(Reservation.party_size >= filters.min_party_size)
+        if filters.max_party_size is not None:
+            query = query.filter(Reservation.party_size <= filters.max_party_size)
+    if after is not None:
+        created_at, reservation_id = after
+        query = query.filter(
+            or_(
+                Reservation.created_at < created_at,
+                and_(Reservation.created_at == created_at, Reservation.id < reservation_id),
+            )
+        )
+
+    query = query.order_by(Reservation.created_at.desc(), Reservation.id.desc())
+    if limit is not None:
+        query = query.limit(limit)
+    return query.all()
 
-def list_reservations_for_user(db: Session, user_id: int) -> List[Reservation]:
-    return (
-        db.query(Reservation)
-        .filter(Reservation.user_id == user_id)
-        .order_by(Reservation.created_at.desc())
-        .all()
-    )
 
+def list_reservations_for_user(db: Session, user_id: int, **kwargs) -> List[Reservation]:
+    return list_reservations(db, user_id=user_id, **kwargs)
 
-def get_reservation(db: Session, reservation_id: int) -> Optional[Reservation]:
-    return db.query(Reservation).filter(Reservation.id == reservation_id).first()
+
+def get_reservation(db: Session, reservation_id: int, location_id: Optional[int] = None) -> Optional[Reservation]:
+    query = db.query(Reservation).filter(Reservation.id == reservation_id)
+    if location_id is not None:
+        query = query.filter(Reservation.location_id == location_id)
+    return query.first()
 
 
 def update_reservation_status(
-    db: Session, reservation: Reservation, update_in: ReservationUpdate
-) -> Reservation:
-    reservation.status = update_in.status
+    db: Session,
+    reservation_id: int,
+    status: str,
+    location_id: Optional[int] = None,
+    user_id: Optional[int] = None,
+    unless_status: Optional[str] = None,
+    from_statuses: Optional[Sequence[str]] = None,
+) -> Optional[Reservation]:
+    conditions = []
+    if location_id is not None:
+        conditions.append(Reservation.location_id == location_id)
+    if user_id is not None:
+        conditions.append(Reservation.user_id == user_id)
+    if unless_status is not None:
+        conditions.append(Reservation.status != unless_status)
+    if from_statuses is not None:
+        conditions.append(Reservation.status.in_(from_statuses))
+    values = {"status": status, "previous_status": Reservation.status}
+    reservation = update_returning(db, Reservation, reservation_id, values, *conditions)
+    if reservation is not None and reservation.previous_status != status:
+        record_reservation_change(
+            db,
+            reservation.location_id,
+            reservation.reserved_for,
+            reservation.party_size,
+            status,
+            reservation.previous_status,
+        )
     db.commit()
-    db.refresh(reservation)
+    if reservation is not None:
+        availability.remove(reservation)
+        availability.add(reservation)
+        _reservations_changed(reservation.location_id)
+        publish_reservation_event("reservation.updated", reservation)
     return reservation
+
+
+def reactivate_reservation(db: Session, reservation: Reservation, status: str) -> Optional[Reservation]:
+    availability.claim(db, reservation.location_id, reservation.reserved_for, reservation.party_size)
+    return update_reservation_status(db, reservation.id, status, reservation.location_id)
@@ -1,11 +1,16 @@
-from typing import Optional
+from typing import Optional, Tuple
 
 from sqlalchemy.orm import Session
 
-from app.core.security import get_password_hash, verify_password
+from app.core.cache import session_cache
+from app.core.config import settings
+from app.core.security import get_password_hash
+from app.crud.base import update_returning
 from app.models.user import User
 from app.schemas.user import UserCreate
 
+AUTH_CACHE_NAMESPACE = "auth"
+
 
 def get_user(db: Session, user_id: int) -> Optional[User]:
     return db.query(User).filter(User.id == user_id).first()
@@ -15,23 +20,50 @@ def get_user_by_email(db: Session, email: str) -> Optional[User]:
     return db.query(User).filter(User.email == email).first()
 
 
-def create_user(db: Session, user_in: UserCreate, role: str = "customer") -> User:
+def create_user(
+    db: Session, user_in: UserCreate, role: str = "customer", hashed_password: Optional[str] = None
+) -> User:
     db_user = User(
         name=user_in.name,
         email=user_in.email,
-        hashed_password=get_password_hash(user_in.password),
+        hashed_password=hashed_password or get_password_hash(user_in.password),
         role=role,
     )
     db.add(db_user)
     db.commit()
-    db.refresh(db_user)
     return db_user
 
 
-def authenticate_user(db: Session, email: str, password: str) -> Optional[User]:
-    user = get_user_by_email(db, email)
-    if not user:
-        return None
-    if not verify_password(password, user.hashed_password):
+def get_user_state(db: Session, user_id: int) -> Optional[Tuple[bool, int, Optional[int]]]:
+    key = f"{AUTH_CACHE_NAMESPACE}:user:{user_id}"
+    cached = session_cache.get(key)
+    if cached is not None:
+        is_active, token_version, location_id = cached.decode().split(":")
+        return is_active == "1", int(token_version), int(location_id) if location_id else None
+    row = db.query(User.is_active, User.token_version, User.location_id).filter(User.id == user_id).first()
+    if row is None:
         return None
+    location = "" if row.location_id is None else row.location_id
+    session_cache.set(key, f"{int(row.is_active)}:{row.token_version}:{location}".encode(), ttl=settings.AUTH_STATE_TTL)
+    return row.is_active, row.token_version, row.location_id
+
+
+def _revoke_tokens(db: Session, user: User, **values) -> User:
+    update_returning(db, User, user.id, {**values, "token_version": User.token_version + 1})
+    db.commit()
+    session_cache.delete(f"{AUTH_CACHE_NAMESPACE}:user:{user.id}")
+    return user
+
+
+def set_user_active(db: Session, user: User, is_active: bool) -> User:
+    return _revoke_tokens(db, user, is_active=is_active)
+
+
+def set_user_location(db: Session, user: User, location_id: Optional[int]) -> User:
+    return _revoke_tokens(db, user, location_id=location_id)
+
+
+def update_password_hash(db: Session, user: User, hashed_password: str) -> User:
+    user.hashed_password = hashed_password
+    db.commit()
     return user
@@ -1,8 +1,8 @@
-from app.db.base import Base
+from app.db.migrate import upgrade
 from app.db.session import engine
 
-from app.models import menu_item, reservation, user  # noqa: F401
+from app.models import idempotency_key, location, menu_item, order, report, reservation, user  # noqa: F401
 
 
 def init_db() -> None:
-    Base.metadata.create_all(bind=engine)
+    upgrade(engine)
@@ -0,0 +1,112 @@
+import importlib
+import pkgutil
+from contextlib import contextmanager
+from typing import Callable, Iterator, List, NamedTuple, Optional
+
+from sqlalchemy import Column, DateTime, Index, Integer, MetaData, String, Table, func, inspect, insert, select, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.schema import CreateColumn
+
+from app.db import migrations
+
+MIGRATIONS_TABLE = "schema_migrations"
+
+_applied = Table(
+    MIGRATIONS_TABLE,
+    MetaData(),
+    Column("version", Integer, primary_key=True),
+    Column("description", String(200), nullable=False),
+    Column("applied_at", DateTime(timezone=True), server_default=func.now()),
+)
+
+
+class Migration(NamedTuple):
+    version: int
+    description: str
+    upgrade: Callable[[Connection], None]
+
+
+def has_column(connection: Connection, table_name: str, column_name: str) -> bool:
+    return column_name in {existing["name"] for existing in inspect(connection).get_columns(table_name)}
+
+
+def add_column(connection: Connection, table_name: str, column: Column) -> None:
+    if has_column(connection, table_name, column.name):
+        return
+    ddl = CreateColumn(column).compile(dialect=connection.dialect)
+    connection.execute(text(f"ALTER TABLE {table_name} ADD COLUMN {ddl}"))
+
+
+def create_index(connection: Connection, name: str, table_name: str, *columns: str) -> None:
+    table = Table(table_name, MetaData(), *(Column(column) for column in columns))
+    Index(name, *(table.c[column] for column in columns)).create(connection, checkfirst=True)
+
+
+def drop_index(connection: Connection, name: str) -> None:
+    connection.execute(text(f"DROP INDEX IF EXISTS {name}"))
+
+
+def load_migrations() -> List[Migration]:
+    found = []
+    for info in pkgutil.iter_modules(migrations.__path__):
+        module = importlib.import_module(f"{migrations.__name__}.{info.name}")
+        found.append(Migration(int(info.name[1:5]), module.description, module.upgrade))
+    return sorted(found)
+
+
+def head_version() -> int:
+    return load_migrations()[-1].version
+
+
+def current_version(connection: Connection) -> int:
+    if not inspect(connection).has_table(MIGRATIONS_TABLE):
+        return 0
+    return connection.execute(select(func.max(_applied.c.version))).scalar() or 0
+
+
+def pending_migrations(engine: Engine) -> List[Migration]:
+    with engine.connect() as connection:
+        version = current_version(connection)
+    return [migration for migration in load_migrations() if migration.version > version]
+
+
+@contextmanager
+def _migration_transaction(engine: Engine) -> Iterator[Connection]:
+    if engine.dialect.name != "sqlite":
+        with engine.begin() as connection:
+            yield connection
+        return
+    # pysqlite does not open a transaction before DDL, so a failed migration would be half applied.
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        connection.exec_driver_sql("BEGIN")
+        try:
+            yield connection
+        except BaseException:
+            connection.exec_driver_sql("ROLLBACK")
+            raise
+        connection.exec_driver_sql("COMMIT")
+
+
+def upgrade(engine: Engine, target: Optional[int] = None) -> List[Migration]:
+    applied = []
+    with engine.begin() as connection:
+        _applied.create(connection, checkfirst=True)
+    for migration in pending_migrations(engine):
+        if target is not None and migration.version > target:
+            break
+        with _migration_transaction(engine) as connection:
+            migration.upgrade(connection)
+            connection.execute(
+                insert(_applied).values(version=migration.version, description=migration.description)
+            )
+        applied.append(migration)
+    return applied
+
+
+def drop_schema(engine: Engine) -> None:
+    from app.db.base import Base
+    from app.db import init_db  # noqa: F401  registers every model on Base.metadata
+
+    with engine.begin() as connection:
+        Base.metadata.drop_all(connection)
+        _applied.drop(connection, checkfirst=True)
@@ -0,0 +1,5 @@
+# Versioned schema migrations, applied in order by app.db.migrate.
+#
+# Each module is named vNNNN_<slug>.py and defines `description` and
+# `upgrade(connection)`. Migrations describe tables with their own MetaData
+# rather than importing the models, so they keep working as the models evolve.
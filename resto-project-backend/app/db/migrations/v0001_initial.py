@@ -0,0 +1,49 @@
+from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Integer, MetaData, Numeric, String, Table, func
+from sqlalchemy.engine import Connection
+
+description = "users, menu items and reservations"
+
+metadata = MetaData()
+
+Table(
+    "users",
+    metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("name", String(120), nullable=False),
+    Column("email", String(255), unique=True, index=True, nullable=False),
+    Column("hashed_password", String(255), nullable=False),
+    Column("role", String(50), nullable=False),
+    Column("is_active", Boolean, nullable=False),
+    Column("created_at", DateTime(timezone=True), server_default=func.now()),
+)
+
+Table(
+    "menu_items",
+    metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("name", String(200), nullable=False),
+    Column("description", String(500)),
+    Column("price", Numeric(10, 2), nullable=False),
+    Column("image_url", String(500)),
+    Column("is_available", Boolean, nullable=False),
+    Column("created_at", DateTime(timezone=True), server_default=func.now()),
+)
+
+Table(
+    "reservations",
+    metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("party_size", Integer, nullable=False),
+    Column("reserved_for", DateTime(timezone=True), nullable=False),
+    Column("guest_name", String(120)),
+    Column("guest_email", String(255)),
+    Column("guest_phone", String(40)),
+    Column("status", String(50), nullable=False),
+    Column("user_id", Integer, ForeignKey("users.id", ondelete="SET NULL")),
+    Column("created_at", DateTime(timezone=True), server_default=func.now()),
+)
+
+
+def upgrade(connection: Connection) -> None:
+    # Databases created before migrations existed already have these tables.
+    metadata.create_all(connection, checkfirst=True)
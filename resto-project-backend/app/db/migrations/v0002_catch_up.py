@@ -0,0 +1,122 @@
+from collections import defaultdict
+
+from sqlalchemy import (
+    JSON,
+    Column,
+    Date,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    LargeBinary,
+    MetaData,
+    Numeric,
+    String,
+    Table,
+    func,
+    insert,
+    inspect,
+    select,
+)
+from sqlalchemy.engine import Connection
+
+from app.db.migrate import add_column, create_index
+
+description = "token versions, menu media and search, idempotency keys, orders and report rollups"
+
+metadata = MetaData()
+
+Table(
+    "idempotency_keys",
+    metadata,
+    Column("owner", String(64), primary_key=True),
+    Column("key", String(255), primary_key=True),
+    Column("request_hash", String(64), nullable=False),
+    Column("status_code", Integer),
+    Column("response_body", LargeBinary),
+    Column("locked_until", DateTime(timezone=True), nullable=False),
+    Column("expires_at", DateTime(timezone=True), nullable=False),
+    Index("ix_idempotency_keys_expires_at", "expires_at"),
+)
+
+Table(
+    "orders",
+    metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("reservation_id", Integer, ForeignKey("reservations.id", ondelete="SET NULL")),
+    Column("table_label", String(40)),
+    Column("notes", String(500)),
+    Column("status", String(20), nullable=False),
+    Column("total", Numeric(10, 2), nullable=False),
+    Column("created_at", DateTime(timezone=True), server_default=func.now()),
+    Index("ix_orders_status_created_at", "status", "created_at"),
+)
+
+Table(
+    "order_lines",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("order_id", Integer, ForeignKey("orders.id", ondelete="CASCADE"), nullable=False, index=True),
+    Column("menu_item_id", Integer, ForeignKey("menu_items.id", ondelete="SET NULL")),
+    Column("name", String(200), nullable=False),
+    Column("quantity", Integer, nullable=False),
+    Column("unit_price", Numeric(10, 2), nullable=False),
+    Column("notes", String(200)),
+)
+
+rollups = Table(
+    "reservation_rollups",
+    metadata,
+    Column("day", Date, primary_key=True),
+    Column("hour", Integer, primary_key=True),
+    Column("status", String(50), primary_key=True),
+    Column("reservations", Integer, nullable=False),
+    Column("covers", Integer, nullable=False),
+)
+
+reservations = Table(
+    "reservations",
+    MetaData(),
+    Column("reserved_for", DateTime(timezone=True)),
+    Column("status", String(50)),
+    Column("party_size", Integer),
+)
+
+# Referenced by the foreign keys above; never created here.
+Table("reservations", metadata, Column("id", Integer, primary_key=True))
+Table("menu_items", metadata, Column("id", Integer, primary_key=True))
+
+
+def _backfill_rollups(connection: Connection) -> None:
+    totals = defaultdict(lambda: [0, 0])
+    for reserved_for, status, party_size in connection.execute(select(reservations)):
+        wall_clock = reserved_for.replace(tzinfo=None)
+        entry = totals[(wall_clock.date(), wall_clock.hour, status)]
+        entry[0] += 1
+        entry[1] += party_size
+    rows = [
+        {"day": day, "hour": hour, "status": status, "reservations": count, "covers": covers}
+        for (day, hour, status), (count, covers) in totals.items()
+    ]
+    if rows:
+        connection.execute(insert(rollups), rows)
+
+
+def upgrade(connection: Connection) -> None:
+    add_column(connection, "users", Column("token_version", Integer, nullable=False, server_default="0"))
+    add_column(connection, "menu_items", Column("image_srcset", JSON))
+    add_column(connection, "menu_items", Column("category", String(100)))
+    add_column(connection, "menu_items", Column("tags", JSON))
+    create_index(connection, "ix_menu_items_category", "menu_items", "category")
+    add_column(connection, "reservations", Column("previous_status", String(50)))
+    create_index(connection, "ix_reservations_created_at_id", "reservations", "created_at", "id")
+    create_index(connection, "ix_reservations_status_reserved_for", "reservations", "status", "reserved_for")
+    create_index(connection, "ix_reservations_user_id_created_at", "reservations", "user_id", "created_at")
+    # Databases built by the old create_all-at-startup may already have these tables, rollups included.
+    backfill = not inspect(connection).has_table("reservation_rollups")
+    metadata.create_all(
+        connection,
+        tables=[metadata.tables[name] for name in ("idempotency_keys", "orders", "order_lines", "reservation_rollups")],
+    )
+    if backfill:
+        _backfill_rollups(connection)
@@ -0,0 +1,145 @@
+from collections import defaultdict
+
+from sqlalchemy import Column, Date, DateTime, ForeignKey, Integer, MetaData, String, Table, func, insert, select, text
+from sqlalchemy.engine import Connection
+
+from app.core.config import settings
+from app.db.migrate import add_column, create_index, drop_index, has_column
+
+description = "locations, with location_id on menu items, reservations, orders, users and rollups"
+
+metadata = MetaData()
+
+locations = Table(
+    "locations",
+    metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("slug", String(60), unique=True, nullable=False),
+    Column("name", String(120), nullable=False),
+    Column("created_at", DateTime(timezone=True), server_default=func.now()),
+)
+
+# SQLite cannot alter a primary key, so the rollups table is rebuilt there.
+rebuilt_rollups = Table(
+    "reservation_rollups_rebuilt",
+    metadata,
+    Column("location_id", Integer, ForeignKey("locations.id", ondelete="CASCADE"), primary_key=True),
+    Column("day", Date, primary_key=True),
+    Column("hour", Integer, primary_key=True),
+    Column("status", String(50), primary_key=True),
+    Column("reservations", Integer, nullable=False),
+    Column("covers", Integer, nullable=False),
+)
+
+rollups = Table(
+    "reservation_rollups",
+    MetaData(),
+    Column("location_id", Integer),
+    Column("day", Date),
+    Column("hour", Integer),
+    Column("status", String(50)),
+    Column("reservations", Integer),
+    Column("covers", Integer),
+)
+
+reservations = Table(
+    "reservations",
+    MetaData(),
+    Column("location_id", Integer),
+    Column("reserved_for", DateTime(timezone=True)),
+    Column("status", String(50)),
+    Column("party_size", Integer),
+)
+
+SCOPED_TABLES = ("menu_items", "reservations", "orders")
+
+
+def _add_location_column(connection: Connection, table_name: str, nullable: bool) -> None:
+    if has_column(connection, table_name, "location_id"):
+        return
+    default = None if nullable else str(settings.DEFAULT_LOCATION_ID)
+    add_column(connection, table_name, Column("location_id", Integer, nullable=nullable, server_default=default))
+    if connection.dialect.name == "sqlite":
+        return
+    on_delete = "SET NULL" if nullable else "CASCADE"
+    connection.execute(
+        text(
+            f"ALTER TABLE {table_name} ADD CONSTRAINT fk_{table_name}_location_id FOREIGN KEY (location_id) "
+            f"REFERENCES locations (id) ON DELETE {on_delete}"
+        )
+    )
+    if default is not None:
+        connection.execute(text(f"ALTER TABLE {table_name} ALTER COLUMN location_id DROP DEFAULT"))
+
+
+def _scope_rollups(connection: Connection) -> None:
+    if has_column(connection, "reservation_rollups", "location_id"):
+        return
+    if connection.dialect.name != "sqlite":
+        _add_location_column(connection, "reservation_rollups", nullable=False)
+        connection.execute(text("ALTER TABLE reservation_rollups DROP CONSTRAINT reservation_rollups_pkey"))
+        connection.execute(text("ALTER TABLE reservation_rollups ADD PRIMARY KEY (location_id, day, hour, status)"))
+        return
+    rebuilt_rollups.create(connection)
+    connection.execute(
+        text(
+            "INSERT INTO reservation_rollups_rebuilt (location_id, day, hour, status, reservations, covers) "
+            "SELECT :location_id, day, hour, status, reservations, covers FROM reservation_rollups"
+        ),
+        {"location_id": settings.DEFAULT_LOCATION_ID},
+    )
+    connection.execute(text("DROP TABLE reservation_rollups"))
+    connection.execute(text("ALTER TABLE reservation_rollups_rebuilt RENAME TO reservation_rollups"))
+
+
+def _backfill_rollups(connection: Connection) -> None:
+    # The old create_all-at-startup could leave an empty rollups table behind next to existing reservations.
+    if connection.execute(select(rollups.c.day).limit(1)).first():
+        return
+    totals = defaultdict(lambda: [0, 0])
+    for location_id, reserved_for, status, party_size in connection.execute(select(reservations)):
+        wall_clock = reserved_for.replace(tzinfo=None)
+        entry = totals[(location_id, wall_clock.date(), wall_clock.hour, status)]
+        entry[0] += 1
+        entry[1] += party_size
+    rows = [
+        {"location_id": location_id, "day": day, "hour": hour, "status": status, "reservations": count, "covers": covers}
+        for (location_id, day, hour, status), (count, covers) in totals.items()
+    ]
+    if rows:
+        connection.execute(insert(rollups), rows)
+
+
+def upgrade(connection: Connection) -> None:
+    locations.create(connection, checkfirst=True)
+    if not connection.execute(select(locations.c.id).where(locations.c.id == settings.DEFAULT_LOCATION_ID)).first():
+        connection.execute(
+            insert(locations).values(id=settings.DEFAULT_LOCATION_ID, slug="main", name=settings.DEFAULT_LOCATION_NAME)
+        )
+    for table_name in SCOPED_TABLES:
+        _add_location_column(connection, table_name, nullable=False)
+    _add_location_column(connection, "users", nullable=True)
+    _scope_rollups(connection)
+    _backfill_rollups(connection)
+
+    drop_index(connection, "ix_menu_items_category")
+    drop_index(connection, "ix_reservations_created_at_id")
+    drop_index(connection, "ix_reservations_status_reserved_for")
+    drop_index(connection, "ix_orders_status_created_at")
+    create_index(connection, "ix_menu_items_location_id_created_at", "menu_items", "location_id", "created_at")
+    create_index(connection, "ix_menu_items_location_id_name", "menu_items", "location_id", "name")
+    create_index(connection, "ix_menu_items_location_id_category", "menu_items", "location_id", "category")
+    create_index(
+        connection, "ix_reservations_location_id_created_at_id", "reservations", "location_id", "created_at", "id"
+    )
+    create_index(
+        connection,
+        "ix_reservations_location_id_status_reserved_for",
+        "reservations",
+        "location_id",
+        "status",
+        "reserved_for",
+    )
+    create_index(
+        connection, "ix_orders_location_id_status_created_at", "orders", "location_id", "status", "created_at"
+    )
@@ -0,0 +1,98 @@
+import itertools
+import threading
+import time
+from typing import List, Optional
+
+from sqlalchemy import create_engine, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from sqlalchemy.orm import Session
+
+from app.core.cache import session_cache
+from app.core.config import settings
+from app.db.pool import async_database_url, engine_options, instrument_engine
+
+READ_YOUR_WRITES_NAMESPACE = "ryw"
+
+
+class ReplicaSet:
+    def __init__(self, engines: list, retry_seconds: int):
+        self.engines = engines
+        self.retry_seconds = retry_seconds
+        self._down_until = [0.0] * len(engines)
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+
+    def candidates(self) -> list:
+        now = time.monotonic()
+        start = next(self._counter)
+        count = len(self.engines)
+        with self._lock:
+            return [
+                self.engines[(start + offset) % count]
+                for offset in range(count)
+                if self._down_until[(start + offset) % count] <= now
+            ]
+
+    def mark_down(self, engine) -> None:
+        with self._lock:
+            self._down_until[self.engines.index(engine)] = time.monotonic() + self.retry_seconds
+
+
+def _sync_replica(url: str) -> Engine:
+    connect_args = {"check_same_thread": False} if url.startswith("sqlite") else {}
+    engine = create_engine(url, connect_args=connect_args, **engine_options(url))
+    instrument_engine(engine)
+    return engine
+
+
+def _async_replica(url: str) -> AsyncEngine:
+    url = async_database_url(url)
+    engine = create_async_engine(url, **engine_options(url, is_async=True))
+    instrument_engine(engine.sync_engine)
+    return engine
+
+
+def build_replicas(urls: List[str], is_async: bool = False) -> Optional[ReplicaSet]:
+    if not urls:
+        return None
+    factory = _async_replica if is_async else _sync_replica
+    return ReplicaSet([factory(url) for url in urls], settings.READ_REPLICA_RETRY_SECONDS)
+
+
+def open_read_session(replicas: Optional[ReplicaSet], session_factory) -> Session:
+    if replicas is not None:
+        for engine in replicas.candidates():
+            db = session_factory(bind=engine)
+            try:
+                db.connection()
+            except exc.DBAPIError:
+                db.close()
+                replicas.mark_down(engine)
+                continue
+            db.info["replica"] = True
+            return db
+    return session_factory()
+
+
+async def open_async_read_session(replicas: Optional[ReplicaSet], session_factory) -> AsyncSession:
+    if replicas is not None:
+        for engine in replicas.candidates():
+            db = session_factory(bind=engine)
+            try:
+                await db.connection()
+            except exc.DBAPIError:
+                await db.close()
+                replicas.mark_down(engine)
+                continue
+            db.info["replica"] = True
+            return db
+    return session_factory()
+
+
+def mark_recent_writer(user_id: int) -> None:
+    session_cache.set(f"{READ_YOUR_WRITES_NAMESPACE}:{user_id}", b"1", ttl=settings.READ_REPLICA_MAX_LAG_SECONDS)
+
+
+def is_recent_writer(user_id: int) -> bool:
+    return session_cache.get(f"{READ_YOUR_WRITES_NAMESPACE}:{user_id}") is not None
@@ -1,11 +1,58 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from typing import Union
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+from starlette.concurrency import run_in_threadpool
 
 from app.core.config import settings
+from app.core.metrics import record_rows_loaded
+from app.db.pool import async_database_url, engine_options, instrument_engine
+from app.db.replicas import build_replicas
+
+DbSession = Union[Session, AsyncSession]
+
 
 connect_args = {}
 if settings.DATABASE_URL.startswith("sqlite"):
     connect_args = {"check_same_thread": False}
 
-engine = create_engine(settings.DATABASE_URL, connect_args=connect_args)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+engine = create_engine(settings.DATABASE_URL, connect_args=connect_args, **engine_options(settings.DATABASE_URL))
+instrument_engine(engine)
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
+
+async_engine = None
+AsyncSessionLocal = None
+if settings.DATABASE_ASYNC:
+    async_url = settings.DATABASE_ASYNC_URL or async_database_url(settings.DATABASE_URL)
+    async_engine = create_async_engine(async_url, **engine_options(async_url, is_async=True))
+    instrument_engine(async_engine.sync_engine)
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+read_replicas = build_replicas(
+    [url.strip() for url in settings.DATABASE_READ_URLS.split(",") if url.strip()],
+    is_async=settings.DATABASE_ASYNC,
+)
+
+
+@event.listens_for(Session, "after_commit")
+def _record_write(session: Session) -> None:
+    session.info["wrote"] = True
+
+
+@event.listens_for(Session, "loaded_as_persistent")
+def _record_loaded(session: Session, instance) -> None:
+    record_rows_loaded()
+
+
+async def run_db(db: DbSession, fn, *args, **kwargs):
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(fn, *args, **kwargs)
+    return await run_in_threadpool(fn, db, *args, **kwargs)
+
+
+async def release_db(db: DbSession) -> None:
+    if isinstance(db, AsyncSession):
+        await db.close()
+    else:
+        await run_in_threadpool(db.close)
@@ -1,18 +1,49 @@
 import os
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
 
 from app.api.api import api_router
+from app.api.body_limit import BodyLimitMiddleware
+from app.api.compression import CompressionMiddleware
+from app.api.idempotency import IdempotentReplay, idempotent_replay_handler
+from app.api.instrumentation import TimingMiddleware
+from app.api.routes import metrics
 from app.core.config import settings
-from app.db.init_db import init_db
+from app.core.images import image_pipeline
+from app.core.static import uploads_app
+from app.db.migrate import pending_migrations, upgrade
+from app.db.session import async_engine, engine
 
 
-def create_app() -> FastAPI:
-    app = FastAPI(title=settings.APP_NAME, docs_url="/", redoc_url=None)
-    init_db()
+def check_schema() -> None:
+    pending = pending_migrations(engine)
+    if not pending:
+        return
+    if settings.DATABASE_MIGRATE_ON_STARTUP:
+        upgrade(engine)
+        return
+    raise RuntimeError(
+        f"Database schema is {len(pending)} migration(s) behind (next: {pending[0].version:04d} "
+        f"{pending[0].description}); run `python -m scripts.migrate` first"
+    )
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await run_in_threadpool(check_schema)
     os.makedirs("uploads/menu", exist_ok=True)
+    yield
+    await run_in_threadpool(image_pipeline.shutdown)
+    if async_engine is not None:
+        await async_engine.dispose()
+    engine.dispose()
+
+
+def create_app() -> FastAPI:
+    app = FastAPI(title=settings.APP_NAME, docs_url="/", redoc_url=None, lifespan=lifespan)
     origins = [origin.strip() for origin in settings.BACKEND_CORS_ORIGINS.split(",") if origin.strip()]
     app.add_middleware(
         CORSMiddleware,
@@ -20,9 +51,22 @@ def create_app() -> FastAPI:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["X-Next-Cursor", "Idempotent-Replayed"],
     )
-    app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
+    if settings.RESPONSE_COMPRESSION:
+        app.add_middleware(
+            CompressionMiddleware,
+            minimum_size=settings.COMPRESSION_MIN_SIZE,
+            compresslevel=settings.GZIP_LEVEL,
+            brotli_quality=settings.BROTLI_QUALITY,
+        )
+    app.add_exception_handler(IdempotentReplay, idempotent_replay_handler)
+    app.add_middleware(BodyLimitMiddleware, max_bytes=settings.MAX_REQUEST_BYTES)
+    app.add_middleware(TimingMiddleware, server_timing=settings.SERVER_TIMING)
+    app.mount("/uploads", uploads_app("uploads"), name="uploads")
     app.include_router(api_router, prefix=settings.API_V1_STR)
+    if settings.METRICS_ENABLED:
+        app.include_router(metrics.router)
     return app
 
 
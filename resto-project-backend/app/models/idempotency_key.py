@@ -0,0 +1,16 @@
+from sqlalchemy import Column, DateTime, Index, Integer, LargeBinary, String
+
+from app.db.base import Base
+
+
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (Index("ix_idempotency_keys_expires_at", "expires_at"),)
+
+    owner = Column(String(64), primary_key=True)
+    key = Column(String(255), primary_key=True)
+    request_hash = Column(String(64), nullable=False)
+    status_code = Column(Integer, nullable=True)
+    response_body = Column(LargeBinary, nullable=True)
+    locked_until = Column(DateTime(timezone=True), nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
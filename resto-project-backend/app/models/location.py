@@ -0,0 +1,14 @@
+from sqlalchemy import Column, DateTime, Integer, String
+from sqlalchemy.sql import func
+
+from app.db.base import Base
+
+
+class Location(Base):
+    __tablename__ = "locations"
+    __mapper_args__ = {"eager_defaults": True}
+
+    id = Column(Integer, primary_key=True, index=True)
+    slug = Column(String(60), unique=True, nullable=False)
+    name = Column(String(120), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
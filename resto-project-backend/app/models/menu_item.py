@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, DateTime, Integer, Numeric, String
+from sqlalchemy import JSON, Boolean, Column, DateTime, ForeignKey, Index, Integer, Numeric, String
 from sqlalchemy.sql import func
 
 from app.db.base import Base
@@ -6,11 +6,21 @@ from app.db.base import Base
 
 class MenuItem(Base):
     __tablename__ = "menu_items"
+    __table_args__ = (
+        Index("ix_menu_items_location_id_created_at", "location_id", "created_at"),
+        Index("ix_menu_items_location_id_name", "location_id", "name"),
+        Index("ix_menu_items_location_id_category", "location_id", "category"),
+    )
+    __mapper_args__ = {"eager_defaults": True}
 
     id = Column(Integer, primary_key=True, index=True)
+    location_id = Column(Integer, ForeignKey("locations.id", ondelete="CASCADE"), nullable=False)
     name = Column(String(200), nullable=False)
     description = Column(String(500), nullable=True)
     price = Column(Numeric(10, 2), nullable=False)
     image_url = Column(String(500), nullable=True)
+    image_srcset = Column(JSON, nullable=True)
+    category = Column(String(100), nullable=True)
+    tags = Column(JSON, nullable=True)
     is_available = Column(Boolean, default=True, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
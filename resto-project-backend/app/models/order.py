@@ -0,0 +1,37 @@
+from sqlalchemy import Column, ForeignKey, Index, Integer, Numeric, String
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+
+from app.db.base import Base
+from app.models.reservation import CreatedAt
+
+
+class Order(Base):
+    __tablename__ = "orders"
+    __table_args__ = (Index("ix_orders_location_id_status_created_at", "location_id", "status", "created_at"),)
+    __mapper_args__ = {"eager_defaults": True}
+
+    id = Column(Integer, primary_key=True, index=True)
+    location_id = Column(Integer, ForeignKey("locations.id", ondelete="CASCADE"), nullable=False)
+    reservation_id = Column(Integer, ForeignKey("reservations.id", ondelete="SET NULL"), nullable=True)
+    table_label = Column(String(40), nullable=True)
+    notes = Column(String(500), nullable=True)
+    status = Column(String(20), default="open", nullable=False)
+    total = Column(Numeric(10, 2), nullable=False)
+    created_at = Column(CreatedAt, server_default=func.now())
+
+    lines = relationship("OrderLine", back_populates="order", order_by="OrderLine.id")
+
+
+class OrderLine(Base):
+    __tablename__ = "order_lines"
+
+    id = Column(Integer, primary_key=True)
+    order_id = Column(Integer, ForeignKey("orders.id", ondelete="CASCADE"), nullable=False, index=True)
+    menu_item_id = Column(Integer, ForeignKey("menu_items.id", ondelete="SET NULL"), nullable=True)
+    name = Column(String(200), nullable=False)
+    quantity = Column(Integer, nullable=False)
+    unit_price = Column(Numeric(10, 2), nullable=False)
+    notes = Column(String(200), nullable=True)
+
+    order = relationship("Order", back_populates="lines")
@@ -0,0 +1,14 @@
+from sqlalchemy import Column, Date, ForeignKey, Integer, String
+
+from app.db.base import Base
+
+
+class ReservationRollup(Base):
+    __tablename__ = "reservation_rollups"
+
+    location_id = Column(Integer, ForeignKey("locations.id", ondelete="CASCADE"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    hour = Column(Integer, primary_key=True)
+    status = Column(String(50), primary_key=True)
+    reservations = Column(Integer, default=0, nullable=False)
+    covers = Column(Integer, default=0, nullable=False)
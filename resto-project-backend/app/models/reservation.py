@@ -1,21 +1,34 @@
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String
+from sqlalchemy.dialects import sqlite
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
 from app.db.base import Base
 
+# SQLite's CURRENT_TIMESTAMP has second resolution; bind the same text format
+# so keyset comparisons against created_at are exact.
+CreatedAt = DateTime(timezone=True).with_variant(sqlite.DATETIME(truncate_microseconds=True), "sqlite")
+
 
 class Reservation(Base):
     __tablename__ = "reservations"
+    __table_args__ = (
+        Index("ix_reservations_location_id_created_at_id", "location_id", "created_at", "id"),
+        Index("ix_reservations_location_id_status_reserved_for", "location_id", "status", "reserved_for"),
+        Index("ix_reservations_user_id_created_at", "user_id", "created_at"),
+    )
+    __mapper_args__ = {"eager_defaults": True}
 
     id = Column(Integer, primary_key=True, index=True)
+    location_id = Column(Integer, ForeignKey("locations.id", ondelete="CASCADE"), nullable=False)
     party_size = Column(Integer, nullable=False)
     reserved_for = Column(DateTime(timezone=True), nullable=False)
     guest_name = Column(String(120), nullable=True)
     guest_email = Column(String(255), nullable=True)
     guest_phone = Column(String(40), nullable=True)
     status = Column(String(50), default="pending", nullable=False)
+    previous_status = Column(String(50), nullable=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(CreatedAt, server_default=func.now())
 
     user = relationship("User", back_populates="reservations")
@@ -0,0 +1,15 @@
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class LocationCreate(BaseModel):
+    slug: str = Field(..., min_length=1, max_length=60, pattern=r"^[a-z0-9-]+$")
+    name: str = Field(..., min_length=1, max_length=120)
+
+
+class LocationRead(LocationCreate):
+    id: int
+    created_at: Optional[datetime] = None
+    model_config = ConfigDict(from_attributes=True)
@@ -1,7 +1,15 @@
 from datetime import datetime
-from typing import Optional
+from typing import Dict, List, Optional
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, field_validator
+
+
+def _normalize_tags(value):
+    if value is None:
+        return []
+    if isinstance(value, str):
+        value = value.split(",")
+    return list(dict.fromkeys(tag.strip().lower() for tag in value if tag and tag.strip()))
 
 
 class MenuItemBase(BaseModel):
@@ -10,6 +18,10 @@ class MenuItemBase(BaseModel):
     price: float
     image_url: Optional[str] = None
     is_available: bool = True
+    category: Optional[str] = None
+    tags: List[str] = []
+
+    _tags = field_validator("tags", mode="before")(_normalize_tags)
 
 
 class MenuItemCreate(MenuItemBase):
@@ -22,9 +34,20 @@ class MenuItemUpdate(BaseModel):
     price: Optional[float] = None
     image_url: Optional[str] = None
     is_available: Optional[bool] = None
+    category: Optional[str] = None
+    tags: Optional[List[str]] = None
+
+    _tags = field_validator("tags", mode="before")(_normalize_tags)
 
 
 class MenuItemRead(MenuItemBase):
     id: int
+    location_id: int
+    image_srcset: Optional[Dict[str, str]] = None
     created_at: Optional[datetime] = None
     model_config = ConfigDict(from_attributes=True)
+
+
+class MenuImportResult(BaseModel):
+    created: int
+    updated: int
@@ -0,0 +1,43 @@
+from datetime import datetime
+from typing import List, Optional
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class OrderLineCreate(BaseModel):
+    menu_item_id: int
+    quantity: int = Field(1, ge=1, le=100)
+    notes: Optional[str] = Field(None, max_length=200)
+
+
+class OrderCreate(BaseModel):
+    reservation_id: Optional[int] = None
+    table_label: Optional[str] = Field(None, max_length=40)
+    notes: Optional[str] = Field(None, max_length=500)
+    lines: List[OrderLineCreate] = Field(..., min_length=1, max_length=200)
+
+
+class OrderLineRead(BaseModel):
+    menu_item_id: Optional[int] = None
+    name: str
+    quantity: int
+    unit_price: float
+    notes: Optional[str] = None
+    model_config = ConfigDict(from_attributes=True)
+
+
+class OrderRead(BaseModel):
+    id: int
+    location_id: int
+    reservation_id: Optional[int] = None
+    table_label: Optional[str] = None
+    notes: Optional[str] = None
+    status: str
+    total: float
+    created_at: Optional[datetime] = None
+    lines: List[OrderLineRead]
+    model_config = ConfigDict(from_attributes=True)
+
+
+class OrderStatusUpdate(BaseModel):
+    status: str
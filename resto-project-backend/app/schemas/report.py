@@ -0,0 +1,28 @@
+from datetime import date
+from typing import List
+
+from pydantic import BaseModel
+
+
+class ReportTotals(BaseModel):
+    reservations: int
+    covers: int
+    cancelled: int
+    no_shows: int
+    cancellation_rate: float
+    no_show_rate: float
+    average_party_size: float
+
+
+class DailyReport(ReportTotals):
+    date: date
+
+
+class HourlyReport(ReportTotals):
+    hour: int
+
+
+class ReportSummary(ReportTotals):
+    date_from: date
+    date_to: date
+    days: List[DailyReport]
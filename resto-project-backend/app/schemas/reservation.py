@@ -1,5 +1,5 @@
-from datetime import datetime
-from typing import Optional
+from datetime import date, datetime
+from typing import List, Optional
 
 from pydantic import BaseModel, ConfigDict, EmailStr
 
@@ -22,7 +22,23 @@ class ReservationUpdate(BaseModel):
 
 class ReservationRead(ReservationBase):
     id: int
+    location_id: int
+    guest_email: Optional[str] = None
     status: str
     user_id: Optional[int] = None
     created_at: Optional[datetime] = None
     model_config = ConfigDict(from_attributes=True)
+
+
+class ReservationFilter(BaseModel):
+    status: Optional[str] = None
+    reserved_from: Optional[datetime] = None
+    reserved_to: Optional[datetime] = None
+    min_party_size: Optional[int] = None
+    max_party_size: Optional[int] = None
+
+
+class AvailabilityRead(BaseModel):
+    date: date
+    party_size: int
+    slots: List[datetime]
@@ -11,3 +11,11 @@ class Token(BaseModel):
 class TokenData(BaseModel):
     user_id: Optional[int] = None
     role: Optional[str] = None
+    version: int = 0
+    location_id: Optional[int] = None
+
+
+class Principal(BaseModel):
+    id: int
+    role: str
+    location_id: Optional[int] = None
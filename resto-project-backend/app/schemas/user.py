@@ -21,6 +21,7 @@ class UserLogin(BaseModel):
 class UserRead(UserBase):
     id: int
     role: str
+    location_id: Optional[int] = None
     is_active: bool
     created_at: Optional[datetime] = None
     model_config = ConfigDict(from_attributes=True)
@@ -0,0 +1,111 @@
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+
+def run_mode(requests: int, concurrency: int, reservations: int) -> dict:
+    import httpx
+
+    from app.core.config import settings
+    from app.core.security import create_access_token
+    from app.crud.user import create_user
+    from app.db.init_db import init_db
+    from app.db.session import SessionLocal
+    from app.main import create_app
+    from app.models.reservation import Reservation
+    from app.schemas.user import UserCreate
+
+    init_db()
+    db = SessionLocal()
+    try:
+        staff = create_user(
+            db, UserCreate(name="Bench Staff", email="bench@example.com", password="Bench123!"), role="staff"
+        )
+        start = datetime(2030, 1, 1, 12, 0)
+        db.add_all(
+            Reservation(
+                location_id=settings.DEFAULT_LOCATION_ID,
+                party_size=2 + i % 4,
+                reserved_for=start + timedelta(minutes=15 * i),
+                guest_name=f"Guest {i}",
+                guest_email=f"guest{i}@example.com",
+                status="pending" if i % 3 else "confirmed",
+            )
+            for i in range(reservations)
+        )
+        db.commit()
+        token = create_access_token(subject=str(staff.id), role=staff.role, version=staff.token_version)
+    finally:
+        db.close()
+
+    app = create_app()
+    headers = {"Authorization": f"Bearer {token}"}
+    fields = "id,party_size,reserved_for,status"
+    paths = [
+        f"/api/v1/reservations/?limit=50&fields={fields}",
+        f"/api/v1/reservations/?limit=50&status=confirmed&fields={fields}",
+        "/api/v1/reservations/availability?date=2030-01-02&party_size=4",
+        "/api/v1/auth/me",
+    ]
+
+    async def main() -> float:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            queue = asyncio.Queue()
+            for i in range(requests):
+                queue.put_nowait(paths[i % len(paths)])
+
+            async def worker():
+                while not queue.empty():
+                    response = await client.get(queue.get_nowait(), headers=headers)
+                    response.raise_for_status()
+
+            started = time.perf_counter()
+            await asyncio.gather(*(worker() for _ in range(concurrency)))
+            return time.perf_counter() - started
+
+    elapsed = asyncio.run(main())
+    return {"requests": requests, "concurrency": concurrency, "seconds": round(elapsed, 3), "rps": round(requests / elapsed, 1)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare sync and async database modes under concurrent load.")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--reservations", type=int, default=5000)
+    parser.add_argument("--mode", choices=["sync", "async"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        print(json.dumps(run_mode(args.requests, args.concurrency, args.reservations)))
+        return
+
+    for mode in ("sync", "async"):
+        env = dict(
+            os.environ,
+            DATABASE_URL=f"sqlite:///{tempfile.mkdtemp()}/bench.db",
+            DATABASE_ASYNC="1" if mode == "async" else "0",
+            BCRYPT_ROUNDS="4",
+        )
+        output = subprocess.run(
+            [sys.executable, __file__, "--mode", mode, *sys.argv[1:]],
+            env=env,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        print(f"{mode:>5}: {result['rps']} req/s ({result['requests']} requests, concurrency {result['concurrency']}, {result['seconds']}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare per-item menu creates with the bulk upsert.")
+    parser.add_argument("--items", type=int, default=10000)
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/bench.db"
+
+    from app.core.config import settings
+    from app.crud.menu_item import bulk_upsert_menu_items, create_menu_item
+    from app.db.init_db import init_db
+    from app.db.migrate import drop_schema
+    from app.db.session import SessionLocal, engine
+    from app.models.menu_item import MenuItem
+    from app.schemas.menu_item import MenuItemCreate
+
+    items = [
+        MenuItemCreate(name=f"Dish {i}", description=f"Seasonal dish {i}", price=5 + i % 20)
+        for i in range(args.items)
+    ]
+
+    def run(label: str, load, prepare=None) -> None:
+        drop_schema(engine)
+        init_db()
+        db = SessionLocal()
+        try:
+            if prepare:
+                prepare(db)
+            started = time.perf_counter()
+            load(db)
+            elapsed = time.perf_counter() - started
+            assert db.query(MenuItem).count() == args.items
+        finally:
+            db.close()
+        print(f"{label:>18}: {elapsed:7.2f}s ({args.items / elapsed:,.0f} items/s)")
+
+    location_id = settings.DEFAULT_LOCATION_ID
+    run("per-item create", lambda db: [create_menu_item(db, location_id, item) for item in items])
+    run("bulk insert", lambda db: bulk_upsert_menu_items(db, location_id, items))
+    run(
+        "bulk re-import",
+        lambda db: bulk_upsert_menu_items(db, location_id, items),
+        prepare=lambda db: bulk_upsert_menu_items(db, location_id, items),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+import argparse
+import gzip
+import json
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from types import SimpleNamespace
+from typing import List, Optional
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+
+def build_rows(count: int) -> list:
+    start = datetime(2030, 1, 1, 12, 0)
+    created = datetime(2029, 12, 1, tzinfo=timezone.utc)
+    return [
+        SimpleNamespace(
+            id=i + 1,
+            location_id=1,
+            party_size=2 + i % 4,
+            reserved_for=start + timedelta(minutes=15 * i),
+            guest_name=f"Guest {i}",
+            guest_email=f"guest{i}@example.com",
+            guest_phone="+1 555 0100",
+            status="pending" if i % 3 else "confirmed",
+            user_id=None,
+            created_at=created + timedelta(seconds=i),
+        )
+        for i in range(count)
+    ]
+
+
+def timed(fn, repeat: int):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        body = fn()
+        best = min(best, time.perf_counter() - started)
+    return body, best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare JSON serialization and compression of reservation listings.")
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    from fastapi.encoders import jsonable_encoder
+    from pydantic import EmailStr, TypeAdapter
+
+    from app.api import compression
+    from app.api.responses import dumps
+    from app.core.config import settings
+    from app.schemas.reservation import ReservationRead
+
+    class EmailReservationRead(ReservationRead):
+        guest_email: Optional[EmailStr] = None
+
+    rows = build_rows(args.rows)
+    legacy = TypeAdapter(List[EmailReservationRead])
+    current = TypeAdapter(List[ReservationRead])
+    fields = ["id", "party_size", "reserved_for", "status"]
+
+    cases = {
+        "jsonable_encoder + json.dumps": lambda: json.dumps(
+            jsonable_encoder(legacy.validate_python(rows, from_attributes=True))
+        ).encode(),
+        "TypeAdapter.dump_json (EmailStr)": lambda: legacy.dump_json(legacy.validate_python(rows, from_attributes=True)),
+        "TypeAdapter.dump_json": lambda: current.dump_json(current.validate_python(rows, from_attributes=True)),
+        "fields: jsonable_encoder": lambda: json.dumps(
+            jsonable_encoder([{name: getattr(row, name) for name in fields} for row in rows])
+        ).encode(),
+        "fields: responses.dumps": lambda: dumps([{name: getattr(row, name) for name in fields} for row in rows]),
+    }
+    print(f"{args.rows} reservations, best of {args.repeat}")
+    for name, fn in cases.items():
+        body, seconds = timed(fn, args.repeat)
+        sizes = [f"raw {len(body)}", f"gzip {len(gzip.compress(body, settings.GZIP_LEVEL))}"]
+        if compression.brotli is not None:
+            sizes.append(f"br {len(compression.brotli.compress(body, quality=settings.BROTLI_QUALITY))}")
+        print(f"{name:>34}: {seconds * 1000:8.1f} ms  bytes: {', '.join(sizes)}")
+
+
+if __name__ == "__main__":
+    main()
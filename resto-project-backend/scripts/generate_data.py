@@ -0,0 +1,166 @@
+import argparse
+import random
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from sqlalchemy import insert, select
+
+from app.core.availability import availability
+from app.core.cache import bump_version
+from app.core.config import settings
+from app.core.security import get_password_hash
+from app.crud.menu_item import bulk_upsert_menu_items, menu_namespace
+from app.crud.report import rebuild_reservation_rollups
+from app.crud.reservation import RESERVATION_CACHE_NAMESPACE, reservation_namespace
+from app.db.migrate import drop_schema
+from app.db.session import SessionLocal, engine
+from app.models.reservation import Reservation
+from app.models.user import User
+from app.schemas.menu_item import MenuItemCreate
+from scripts.seed_data import seed
+
+CUSTOMER_PASSWORD = "Load123!"
+BATCH_SIZE = 5000
+PARTY_SIZES = {1: 5, 2: 40, 3: 12, 4: 25, 5: 6, 6: 8, 8: 4}
+HOUR_WEIGHTS = {12: 4, 13: 4, 14: 2, 18: 5, 19: 8, 20: 7, 21: 3}
+WEEKDAY_WEIGHTS = [0.8, 0.8, 0.9, 1.0, 1.5, 1.7, 1.2]
+COURSES = ["Starter", "Salad", "Soup", "Pasta", "Pizza", "Grill", "Curry", "Dessert", "Drink"]
+DIETARY_TAGS = ["vegetarian", "vegan", "gluten-free", "spicy", "nut-free", "dairy-free"]
+
+
+def customer_email(index: int) -> str:
+    return f"customer{index}@example.com"
+
+
+def _statuses(rng: random.Random, past: bool) -> str:
+    if past:
+        return rng.choices(["confirmed", "cancelled", "pending"], [70, 15, 15])[0]
+    return rng.choices(["pending", "confirmed", "cancelled"], [50, 40, 10])[0]
+
+
+def _slot_times() -> list:
+    slots = []
+    last_seating = datetime.combine(datetime.min, availability.closes) - availability.turn
+    current = datetime.combine(datetime.min, availability.opens)
+    while current <= last_seating:
+        weight = HOUR_WEIGHTS.get(current.hour, 1)
+        slots.append((current.time(), weight))
+        current += availability.slot
+    return slots
+
+
+def generate_users(db, count: int) -> list:
+    emails = [customer_email(index) for index in range(count)]
+    existing = set()
+    for start in range(0, count, BATCH_SIZE):
+        existing.update(db.scalars(select(User.email).where(User.email.in_(emails[start:start + BATCH_SIZE]))))
+    hashed = get_password_hash(CUSTOMER_PASSWORD)
+    rows = [
+        {"name": f"Customer {index}", "email": email, "hashed_password": hashed, "role": "customer"}
+        for index, email in enumerate(emails)
+        if email not in existing
+    ]
+    for start in range(0, len(rows), BATCH_SIZE):
+        db.execute(insert(User), rows[start:start + BATCH_SIZE])
+    db.commit()
+    return list(db.scalars(select(User.id).where(User.role == "customer")))
+
+
+def generate_menu(db, location_id: int, count: int, rng: random.Random) -> None:
+    items = [
+        MenuItemCreate(
+            name=f"{COURSES[index % len(COURSES)]} No. {index}",
+            description=f"House {COURSES[index % len(COURSES)].lower()} made to order",
+            price=round(rng.uniform(4, 38), 2),
+            is_available=rng.random() > 0.05,
+            category=COURSES[index % len(COURSES)],
+            tags=rng.sample(DIETARY_TAGS, rng.randint(0, 2)),
+        )
+        for index in range(count)
+    ]
+    bulk_upsert_menu_items(db, location_id, items)
+
+
+def generate_reservations(
+    db, location_id: int, count: int, days: int, user_ids: list, rng: random.Random
+) -> None:
+    now = datetime.now(timezone.utc)
+    first_day = now.date() - timedelta(days=days // 2)
+    dates = [first_day + timedelta(days=offset) for offset in range(days)]
+    days_drawn = rng.choices(dates, [WEEKDAY_WEIGHTS[value.weekday()] for value in dates], k=count)
+    slots = _slot_times()
+    slots_drawn = rng.choices([slot for slot, _ in slots], [weight for _, weight in slots], k=count)
+    max_party = max(availability.sizes)
+    sizes = [size for size in PARTY_SIZES if size <= max_party]
+    sizes_drawn = rng.choices(sizes, [PARTY_SIZES[size] for size in sizes], k=count)
+    rows = []
+    for day, slot, party_size in zip(days_drawn, slots_drawn, sizes_drawn):
+        reserved_for = datetime.combine(day, slot, tzinfo=timezone.utc)
+        created_at = min(now, reserved_for - timedelta(minutes=rng.randint(60, 60 * 24 * 21)))
+        row = {
+            "location_id": location_id,
+            "party_size": party_size,
+            "reserved_for": reserved_for,
+            "status": _statuses(rng, reserved_for < now),
+            "created_at": created_at,
+            "user_id": None,
+            "guest_name": None,
+            "guest_email": None,
+            "guest_phone": None,
+        }
+        if user_ids and rng.random() < 0.6:
+            row["user_id"] = rng.choice(user_ids)
+        else:
+            guest = rng.randint(0, 999999)
+            row.update(
+                guest_name=f"Guest {guest}",
+                guest_email=f"guest{guest}@example.com",
+                guest_phone=f"555-{guest % 10000:04d}",
+            )
+        rows.append(row)
+        if len(rows) == BATCH_SIZE:
+            db.execute(insert(Reservation.__table__), rows)
+            rows = []
+    if rows:
+        db.execute(insert(Reservation.__table__), rows)
+    db.commit()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Generate a production-sized dataset on top of the seed data.")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--menu-items", type=int, default=300)
+    parser.add_argument("--reservations", type=int, default=20000)
+    parser.add_argument("--days", type=int, default=180, help="spread reservations over this many days around today")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--location-id", type=int, default=settings.DEFAULT_LOCATION_ID)
+    parser.add_argument("--reset", action="store_true", help="drop and recreate all tables first")
+    args = parser.parse_args()
+
+    if args.reset:
+        drop_schema(engine)
+    seed()
+    rng = random.Random(args.seed)
+    db = SessionLocal()
+    try:
+        user_ids = generate_users(db, args.users)
+        generate_menu(db, args.location_id, args.menu_items, rng)
+        generate_reservations(db, args.location_id, args.reservations, args.days, user_ids, rng)
+        rebuild_reservation_rollups(db)
+    finally:
+        db.close()
+    bump_version(menu_namespace(args.location_id))
+    bump_version(reservation_namespace(args.location_id))
+    bump_version(RESERVATION_CACHE_NAMESPACE)
+    availability.clear()
+    print(
+        f"Generated {args.users} customers (password {CUSTOMER_PASSWORD}), "
+        f"{args.menu_items} menu items and {args.reservations} reservations."
+    )
+
+
+if __name__ == "__main__":
+    main()
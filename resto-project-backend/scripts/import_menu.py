@@ -0,0 +1,49 @@
+import argparse
+import csv
+import json
+import sys
+from pathlib import Path
+from typing import List
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from pydantic import TypeAdapter, ValidationError
+
+from app.core.config import settings
+from app.crud.menu_item import bulk_upsert_menu_items
+from app.db.init_db import init_db
+from app.db.session import SessionLocal
+from app.schemas.menu_item import MenuItemCreate
+
+_menu_items_adapter = TypeAdapter(List[MenuItemCreate])
+
+
+def read_rows(path: Path) -> List[dict]:
+    with path.open(newline="", encoding="utf-8") as handle:
+        if path.suffix.lower() == ".csv":
+            return [{key: value for key, value in row.items() if value != ""} for row in csv.DictReader(handle)]
+        return [json.loads(line) for line in handle if line.strip()]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Upsert menu items (matched by name) from a CSV or JSON-lines file.")
+    parser.add_argument("path", type=Path, help="menu.csv, or menu.jsonl with one item per line")
+    parser.add_argument("--location-id", type=int, default=settings.DEFAULT_LOCATION_ID)
+    args = parser.parse_args()
+
+    try:
+        items = _menu_items_adapter.validate_python(read_rows(args.path))
+    except ValidationError as error:
+        sys.exit(f"Import aborted, nothing written:\n{error}")
+
+    init_db()
+    db = SessionLocal()
+    try:
+        result = bulk_upsert_menu_items(db, args.location_id, items)
+    finally:
+        db.close()
+    print(f"Imported {len(items)} items: {result['created']} created, {result['updated']} updated.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+import argparse
+import asyncio
+import random
+import sys
+import time
+from collections import defaultdict
+from datetime import date, datetime, time as clock, timedelta
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from app.core.config import settings
+from scripts.generate_data import CUSTOMER_PASSWORD, customer_email
+
+WORKLOAD = {
+    "menu": 35,
+    "menu_search": 10,
+    "availability": 15,
+    "login": 10,
+    "book": 15,
+    "my_reservations": 5,
+    "staff_listing": 10,
+}
+# Beyond the window generate_data.py fills by default, so most bookings can succeed, but inside the
+# horizon the API accepts.
+BOOKING_HORIZON_DAYS = (91, settings.AVAILABILITY_MAX_DAYS_AHEAD)
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+class LoadTest:
+    def __init__(self, client, users: int, rng: random.Random):
+        self.client = client
+        self.users = users
+        self.rng = rng
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.statuses: Dict[str, Dict[int, int]] = defaultdict(lambda: defaultdict(int))
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.customer_tokens: List[str] = []
+        self.staff_token = None
+
+    async def call(self, name: str, method: str, url: str, **kwargs):
+        started = time.perf_counter()
+        response = await self.client.request(method, url, **kwargs)
+        elapsed = time.perf_counter() - started
+        self.statuses[name][response.status_code] += 1
+        # Rejected requests are usually fast, so they would flatter the latency percentiles.
+        if response.is_success:
+            self.latencies[name].append(elapsed)
+        else:
+            self.errors[name] += 1
+        return response
+
+    async def login(self, email: str, password: str):
+        response = await self.call("login", "POST", "/api/v1/auth/login", json={"email": email, "password": password})
+        return response.json().get("access_token") if response.status_code == 200 else None
+
+    def _future_day(self) -> date:
+        return date.today() + timedelta(days=self.rng.randint(BOOKING_HORIZON_DAYS[0], BOOKING_HORIZON_DAYS[1]))
+
+    def _future_slot(self) -> datetime:
+        day = self._future_day()
+        return datetime.combine(day, clock(self.rng.choice([12, 13, 18, 19, 20]), self.rng.choice([0, 15, 30, 45])))
+
+    async def step(self, action: str) -> None:
+        if action == "menu":
+            await self.call("menu", "GET", "/api/v1/menu/")
+        elif action == "menu_search":
+            query = self.rng.choice(["piz", "soup", "curry", "des", "gril", "sal"])
+            await self.call("menu_search", "GET", f"/api/v1/menu/search?q={query}&available=true")
+        elif action == "availability":
+            await self.call(
+                "availability",
+                "GET",
+                f"/api/v1/reservations/availability?date={self._future_day()}&party_size={self.rng.randint(1, 6)}"
+            )
+        elif action == "login":
+            token = await self.login(customer_email(self.rng.randrange(self.users)), CUSTOMER_PASSWORD)
+            if token:
+                self.customer_tokens.append(token)
+        elif action == "book":
+            payload = {"party_size": self.rng.randint(1, 6), "reserved_for": self._future_slot().isoformat()}
+            headers = {}
+            if self.customer_tokens and self.rng.random() < 0.6:
+                headers["Authorization"] = f"Bearer {self.rng.choice(self.customer_tokens)}"
+            else:
+                payload.update(guest_name="Load Guest", guest_email="load.guest@example.com")
+            await self.call("book", "POST", "/api/v1/reservations/", json=payload, headers=headers)
+        elif action == "my_reservations" and self.customer_tokens:
+            headers = {"Authorization": f"Bearer {self.rng.choice(self.customer_tokens)}"}
+            await self.call("my_reservations", "GET", "/api/v1/reservations/me?limit=50", headers=headers)
+        elif action == "staff_listing" and self.staff_token:
+            headers = {"Authorization": f"Bearer {self.staff_token}"}
+            status = self.rng.choice(["", "&status=pending", "&status=confirmed"])
+            await self.call("staff_listing", "GET", f"/api/v1/reservations/?limit=100{status}", headers=headers)
+
+    async def run(self, requests: int, concurrency: int) -> float:
+        self.staff_token = await self.login("staff@example.com", "Staff123!")
+        for _ in range(min(concurrency, self.users)):
+            token = await self.login(customer_email(self.rng.randrange(self.users)), CUSTOMER_PASSWORD)
+            if token:
+                self.customer_tokens.append(token)
+        self.latencies.clear()
+        self.statuses.clear()
+        self.errors.clear()
+
+        actions = self.rng.choices(list(WORKLOAD), list(WORKLOAD.values()), k=requests)
+        queue: asyncio.Queue = asyncio.Queue()
+        for action in actions:
+            queue.put_nowait(action)
+
+        async def worker():
+            while not queue.empty():
+                await self.step(queue.get_nowait())
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return time.perf_counter() - started
+
+    def report(self, elapsed: float) -> None:
+        succeeded = sum(len(samples) for samples in self.latencies.values())
+        errors = sum(self.errors.values())
+        total = succeeded + errors
+        print(f"{total} requests in {elapsed:.2f}s ({total / elapsed:.1f} req/s), {errors} errors")
+        print(
+            f"{'endpoint':>16} {'ok':>6} {'errors':>6} {'req/s':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}  statuses"
+        )
+        for name in WORKLOAD:
+            samples = self.latencies.get(name, [])
+            if not samples and not self.errors.get(name):
+                continue
+            statuses = ", ".join(f"{code}x{count}" for code, count in sorted(self.statuses[name].items()))
+            timings = " ".join(
+                f"{percentile(samples, pct) * 1000:>8.1f}" if samples else f"{'-':>8}" for pct in (50, 95, 99)
+            )
+            print(
+                f"{name:>16} {len(samples):>6} {self.errors.get(name, 0):>6}"
+                f" {len(samples) / elapsed:>7.1f} {timings}  {statuses}"
+            )
+
+
+async def main_async(args) -> None:
+    import httpx
+
+    if args.base_url:
+        client = httpx.AsyncClient(base_url=args.base_url, timeout=60)
+    else:
+        from app.main import create_app
+
+        settings.RATE_LIMIT_ENABLED = args.rate_limit
+
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=create_app()), base_url="http://load", timeout=60)
+    async with client:
+        load_test = LoadTest(client, args.users, random.Random(args.seed))
+        elapsed = await load_test.run(args.requests, args.concurrency)
+    load_test.report(elapsed)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Mixed-workload load test. Populate the database with scripts/generate_data.py first."
+    )
+    parser.add_argument("--base-url", help="target a running server instead of the in-process app")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--users", type=int, default=1000, help="customer count used by generate_data.py")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--rate-limit", action="store_true", help="keep rate limiting on for the in-process app")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from app.db.migrate import current_version, head_version, pending_migrations, upgrade
+from app.db.session import engine
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Apply pending schema migrations to DATABASE_URL.")
+    parser.add_argument("--target", type=int, help="stop after this migration version")
+    parser.add_argument("--status", action="store_true", help="only report the current and pending versions")
+    args = parser.parse_args()
+
+    if args.status:
+        with engine.connect() as connection:
+            version = current_version(connection)
+        pending = pending_migrations(engine)
+        print(f"Schema at version {version} of {head_version()}.")
+        for migration in pending:
+            print(f"  pending {migration.version:04d} {migration.description}")
+        return
+
+    applied = upgrade(engine, target=args.target)
+    for migration in applied:
+        print(f"Applied {migration.version:04d} {migration.description}")
+    if not applied:
+        print("Schema already up to date.")
+
+
+if __name__ == "__main__":
+    main()
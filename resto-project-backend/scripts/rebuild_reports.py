@@ -0,0 +1,28 @@
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from app.crud.report import rebuild_reservation_rollups
+from app.db.init_db import init_db
+from app.db.session import SessionLocal
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Recompute the reservation report rollups from the reservations table.")
+    parser.parse_args()
+
+    init_db()
+    started = time.perf_counter()
+    db = SessionLocal()
+    try:
+        buckets = rebuild_reservation_rollups(db)
+    finally:
+        db.close()
+    print(f"Rebuilt {buckets} rollup buckets in {time.perf_counter() - started:.2f}s.")
+
+
+if __name__ == "__main__":
+    main()
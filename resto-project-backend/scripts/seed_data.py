@@ -5,6 +5,7 @@ from pathlib import Path
 
 sys.path.append(str(Path(__file__).resolve().parents[1]))
 
+from app.core.config import settings
 from app.crud.menu_item import create_menu_item
 from app.crud.reservation import create_reservation
 from app.crud.user import create_user, get_user_by_email
@@ -76,10 +77,10 @@ def seed() -> None:
             )
 
         for item in MENU_ITEMS:
-            create_menu_item(db, item)
+            create_menu_item(db, settings.DEFAULT_LOCATION_ID, item)
 
         for reservation in GUEST_RESERVATIONS:
-            create_reservation(db, reservation, user_id=None)
+            create_reservation(db, settings.DEFAULT_LOCATION_ID, reservation, user_id=None, check_capacity=False)
 
         print("Seed completed.")
     finally:
@@ -1,4 +1,5 @@
 import os
+import sqlite3
 import sys
 import tempfile
 from pathlib import Path
@@ -9,12 +10,22 @@ from fastapi.testclient import TestClient
 sys.path.append(str(Path(__file__).resolve().parents[1]))
 
 os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/test.db")
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+os.environ.setdefault("METRICS_ENABLED", "1")
 
 from app.api.deps import get_db
+from app.core.availability import availability
+from app.core.cache import cache, session_cache, version_cache
 from app.core.config import settings
+from app.core.events import event_broker
+from app.core.kitchen import kitchen_queue
+from app.core.menu_search import menu_search
+from app.core.rate_limit import rate_limit_store
+from app.crud.location import forget_locations, location_exists
 from app.crud.menu_item import create_menu_item
 from app.crud.user import create_user
-from app.db.base import Base
+from app.db.init_db import init_db
+from app.db.migrate import drop_schema
 from app.db.session import SessionLocal, engine
 from app.main import create_app
 from app.schemas.menu_item import MenuItemCreate
@@ -29,36 +40,61 @@ def override_get_db():
         db.close()
 
 
-@pytest.fixture()
-def client():
-    app = create_app()
-    app.dependency_overrides[get_db] = override_get_db
+def _seed(db) -> None:
+    create_user(db, UserCreate(name="Admin", email="admin@example.com", password="Admin123!"), role="admin")
+    create_user(db, UserCreate(name="Staff", email="staff@example.com", password="Staff123!"), role="staff")
+    create_user(db, UserCreate(name="Customer", email="customer@example.com", password="Cust123!"), role="customer")
+    create_menu_item(db, settings.DEFAULT_LOCATION_ID, MenuItemCreate(name="Test Burger", description="Test", price=9.99))
 
-    Base.metadata.drop_all(bind=engine)
-    Base.metadata.create_all(bind=engine)
 
+@pytest.fixture(scope="session")
+def template_db():
+    # Migrate and seed once; every test then starts from this state.
+    drop_schema(engine)
+    init_db()
     db = SessionLocal()
     try:
-        create_user(
-            db,
-            UserCreate(name="Admin", email="admin@example.com", password="Admin123!"),
-            role="admin",
-        )
-        create_user(
-            db,
-            UserCreate(name="Staff", email="staff@example.com", password="Staff123!"),
-            role="staff",
-        )
-        create_user(
-            db,
-            UserCreate(name="Customer", email="customer@example.com", password="Cust123!"),
-            role="customer",
-        )
-        create_menu_item(
-            db,
-            MenuItemCreate(name="Test Burger", description="Test", price=9.99),
-        )
+        _seed(db)
     finally:
         db.close()
+    engine.dispose()
+    template = sqlite3.connect(":memory:", check_same_thread=False)
+    with sqlite3.connect(engine.url.database) as source:
+        source.backup(template)
+    yield template
+    template.close()
+
+
+def _reset_process_state() -> None:
+    cache.clear()
+    session_cache.clear()
+    version_cache.clear()
+    availability.clear()
+    rate_limit_store.clear()
+    event_broker.clear()
+    menu_search.clear()
+    kitchen_queue.clear()
+    forget_locations()
+
+
+def _restore(template: sqlite3.Connection) -> None:
+    target = sqlite3.connect(engine.url.database)
+    try:
+        template.backup(target)
+    finally:
+        target.close()
 
+
+@pytest.fixture()
+def client(template_db):
+    app = create_app()
+    if not settings.DATABASE_ASYNC:
+        app.dependency_overrides[get_db] = override_get_db
+    _reset_process_state()
+    _restore(template_db)
+    db = SessionLocal()
+    try:
+        location_exists(db, settings.DEFAULT_LOCATION_ID)
+    finally:
+        db.close()
     return TestClient(app)
@@ -4,11 +4,16 @@ const api = axios.create({
   baseURL: process.env.VUE_APP_API_URL || 'http://localhost:8000/api/v1'
 });
 
+export const locationId = process.env.VUE_APP_LOCATION_ID || null;
+
 api.interceptors.request.use(config => {
   const token = localStorage.getItem('accessToken');
   if (token) {
     config.headers.Authorization = `Bearer ${token}`;
   }
+  if (locationId) {
+    config.params = { location_id: locationId, ...config.params };
+  }
   return config;
 });
 
@@ -0,0 +1,55 @@
+import api, { locationId } from './api';
+
+export function subscribeReservations({ onEvent, onReset }) {
+  const controller = new AbortController();
+  let lastEventId = null;
+  let retryMs = 3000;
+
+  const handleBlock = block => {
+    let data = null;
+    let event = 'message';
+    for (const line of block.split('\n')) {
+      if (line.startsWith('id: ')) lastEventId = line.slice(4);
+      else if (line.startsWith('event: ')) event = line.slice(7);
+      else if (line.startsWith('data: ')) data = line.slice(6);
+      else if (line.startsWith('retry: ')) retryMs = Number(line.slice(7)) || retryMs;
+    }
+    if (event === 'reset') onReset();
+    else if (data) onEvent(JSON.parse(data));
+  };
+
+  const connect = async () => {
+    while (!controller.signal.aborted) {
+      try {
+        const headers = { Accept: 'text/event-stream' };
+        const token = localStorage.getItem('accessToken');
+        if (token) headers.Authorization = `Bearer ${token}`;
+        if (lastEventId) headers['Last-Event-ID'] = lastEventId;
+        const query = locationId ? `?location_id=${encodeURIComponent(locationId)}` : '';
+        const response = await fetch(`${api.defaults.baseURL}/reservations/stream${query}`, {
+          headers,
+          signal: controller.signal
+        });
+        if (response.status === 401 || response.status === 403) return;
+        if (response.ok) {
+          const reader = response.body.pipeThrough(new TextDecoderStream()).getReader();
+          let buffer = '';
+          for (;;) {
+            const { value, done } = await reader.read();
+            if (done) break;
+            buffer += value;
+            const blocks = buffer.split('\n\n');
+            buffer = blocks.pop();
+            blocks.forEach(handleBlock);
+          }
+        }
+      } catch (err) {
+        if (controller.signal.aborted) return;
+      }
+      await new Promise(resolve => setTimeout(resolve, retryMs));
+    }
+  };
+
+  connect();
+  return () => controller.abort();
+}